@@ -0,0 +1,334 @@
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_async_db
+from app.dependencies import get_current_user_id
+from core.metrics import stage_timer
+from models.document import Document  # type: ignore
+from services.document_queries import (
+    InvalidCursor,
+    fetch_chunks,
+    get_document_with_chunks,
+    list_documents,
+)
+from services.job_queue import get_job_queue
+from services.progress import progress_tracker
+from services.upload import (
+    FileTooLargeError,
+    StoredUpload,
+    UploadError,
+    delete_stored_file,
+    discard_upload,
+    receive_upload,
+)
+
+router = APIRouter()
+
+PROGRESS_POLL_INTERVAL = 0.5
+QUEUE_FULL_RETRY_AFTER = 30  # 초
+
+
+def _document_response(document: Document, duplicate: bool = False) -> dict:
+    return {
+        "id": document.id,
+        "title": document.title,
+        "filename": document.filename,
+        "file_size": document.file_size,
+        "file_type": document.file_type,
+        "is_processed": document.is_processed,
+        "created_at": document.created_at,
+        "duplicate": duplicate,
+    }
+
+
+async def _find_duplicate(db: AsyncSession, user_id: int, sha256: str):
+    result = await db.execute(
+        select(Document)
+        .where(Document.user_id == user_id)
+        .where(Document.content_hash == sha256)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _create_document(
+    db: AsyncSession, user_id: int, stored: StoredUpload, title: str
+) -> Document:
+    document = Document(
+        title=title,
+        filename=stored.filename,
+        file_path=stored.location,
+        file_size=stored.size,
+        file_type=stored.extension.lstrip("."),
+        content_hash=stored.sha256,
+        is_processed=False,
+        user_id=user_id,
+    )
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    return document
+
+
+async def _enqueue_ingestion(document_id: int) -> None:
+    await run_in_threadpool(progress_tracker.update, document_id, stage="queued")
+    await run_in_threadpool(get_job_queue().enqueue, document_id)
+
+
+async def _get_owned_document(
+    db: AsyncSession, document_id: int, user_id: int
+) -> Document:
+    document = await db.get(Document, document_id)
+    if document is None or document.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="문서를 찾을 수 없습니다.",
+        )
+    return document
+
+
+@router.get("")
+async def get_documents(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 목록 (최신순, 커서 페이지네이션)"""
+    try:
+        rows, next_cursor = await list_documents(db, user_id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "items": [
+            {**_document_response(document), "chunk_count": chunk_count}
+            for document, chunk_count in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def _check_queue_depth() -> None:
+    """처리 대기열이 가득 차 있으면 본문을 받기 전에 503 으로 거절"""
+    depth = await run_in_threadpool(get_job_queue().depth)
+    if depth >= settings.INGEST_QUEUE_MAX_DEPTH:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="문서 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER)},
+        )
+
+
+def _content_length(request: Request) -> int:
+    """Content-Length 헤더를 검사 (본문 크기 사전 제한용)"""
+    value = request.headers.get("content-length")
+    if value is None:
+        raise HTTPException(
+            status_code=status.HTTP_411_LENGTH_REQUIRED,
+            detail="Content-Length 헤더가 필요합니다.",
+        )
+    if not value.strip().isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Content-Length 헤더가 올바르지 않습니다.",
+        )
+    return int(value)
+
+
+async def _receive_upload(request: Request) -> Tuple[StoredUpload, Dict[str, str]]:
+    content_length = _content_length(request)
+    if content_length > settings.MAX_FILE_SIZE + settings.UPLOAD_FIELD_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="파일 크기가 최대 허용 크기를 초과했습니다.",
+        )
+    try:
+        async with stage_timer("upload"):
+            return await receive_upload(
+                request.headers.get("content-type", ""), request.stream()
+            )
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_document(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 업로드
+
+    요청 본문을 청크 단위로 UPLOAD_DIR(또는 S3)에 스트리밍 저장하면서
+    크기 제한과 SHA-256 해시를 계산한다. 같은 사용자가 동일한 파일을
+    다시 올리면 기존 문서를 반환한다. 처리는 수집 작업 큐에 넘기며, 큐가
+    가득 차 있으면 본문을 받기 전에 503 으로 거절한다.
+    """
+    await _check_queue_depth()
+    stored, fields = await _receive_upload(request)
+
+    duplicate = await _find_duplicate(db, user_id, stored.sha256)
+    if duplicate is not None:
+        await discard_upload(stored)
+        if not duplicate.is_processed:
+            # 실패했거나 대기열에서 사라진 문서는 다시 처리 (대기 중이면 무시됨)
+            await _enqueue_ingestion(duplicate.id)
+        return _document_response(duplicate, duplicate=True)
+
+    title = fields.get("title") or stored.filename
+    document = await _create_document(db, user_id, stored, title)
+    await _enqueue_ingestion(document.id)
+    return _document_response(document)
+
+
+@router.put("/{document_id}/file")
+async def replace_document_file(
+    document_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 파일 교체 (개정판 업로드)
+
+    새 파일로 문서를 다시 처리한다. 본문이 같은 청크는 기존 행과 임베딩을
+    그대로 쓰므로 일부만 고친 개정판은 바뀐 청크만 임베딩한다. 재사용한
+    청크 수는 진행률의 ``reused_chunks`` 로 확인할 수 있다. 이전 파일은
+    처리 중인 작업이 읽고 있을 수 있어 작업이 끝난 뒤 워커가 삭제한다.
+    """
+    await _check_queue_depth()
+    document = await _get_owned_document(db, document_id, user_id)
+    stored, fields = await _receive_upload(request)
+    if stored.sha256 == document.content_hash:
+        await discard_upload(stored)
+        return _document_response(document)
+
+    stale_files = json.loads(document.stale_file_paths or "[]")
+    stale_files.append(document.file_path)
+    document.stale_file_paths = json.dumps(stale_files)
+    document.filename = stored.filename
+    document.file_path = stored.location
+    document.file_size = stored.size
+    document.file_type = stored.extension.lstrip(".")
+    document.content_hash = stored.sha256
+    document.is_processed = False
+    if fields.get("title"):
+        document.title = fields["title"]
+    await db.commit()
+    await _enqueue_ingestion(document.id)
+    return _document_response(document)
+
+
+@router.get("/{document_id}")
+async def get_document(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 상세 (청크 목록 포함, 본문 제외)"""
+    document = await get_document_with_chunks(db, document_id, user_id)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="문서를 찾을 수 없습니다.",
+        )
+    return {
+        **_document_response(document),
+        "chunk_count": len(document.chunks),
+        "chunks": [chunk.to_dict() for chunk in document.chunks],
+    }
+
+
+@router.delete("/{document_id}")
+async def delete_document(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 삭제
+
+    청크는 DB 의 ON DELETE CASCADE 로 함께 지워진다. 벡터·역색인 항목은
+    수집 워커가 큐에서 삭제된 문서를 꺼낼 때 정리한다.
+    """
+    document = await _get_owned_document(db, document_id, user_id)
+    locations = [document.file_path, *json.loads(document.stale_file_paths or "[]")]
+    await db.delete(document)
+    await db.commit()
+    for location in locations:
+        await delete_stored_file(location)
+    await run_in_threadpool(get_job_queue().enqueue, document_id)
+    return {"message": "문서가 성공적으로 삭제되었습니다."}
+
+
+@router.get("/{document_id}/chunks")
+async def get_document_chunks(
+    document_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    include_content: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 청크 목록 (chunk_index 순, 커서 페이지네이션)"""
+    await _get_owned_document(db, document_id, user_id)
+    try:
+        chunks, next_cursor = await fetch_chunks(
+            db, document_id, cursor, limit, include_content=include_content
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "items": [chunk.to_dict(include_large=include_content) for chunk in chunks],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/{document_id}/progress")
+async def get_document_progress(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 처리 진행률 조회"""
+    document = await _get_owned_document(db, document_id, user_id)
+    progress = await run_in_threadpool(progress_tracker.get, document_id)
+    if progress is None:
+        stage = "completed" if document.is_processed else "uploaded"
+        return {"document_id": document_id, "stage": stage}
+    return progress.to_dict()
+
+
+@router.get("/{document_id}/progress/stream")
+async def stream_document_progress(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 처리 진행률 SSE 스트림"""
+    await _get_owned_document(db, document_id, user_id)
+
+    async def events():
+        last_update = None
+        while True:
+            progress = await run_in_threadpool(progress_tracker.get, document_id)
+            if progress is None:
+                return
+            if progress.updated_at != last_update:
+                last_update = progress.updated_at
+                yield f"data: {json.dumps(progress.to_dict())}\n\n"
+            if progress.is_finished:
+                return
+            await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
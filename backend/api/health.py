@@ -1,9 +1,10 @@
 import os
 from datetime import datetime
 
-import psutil  # type: ignore  # Library stubs not installed for "psutil"
 from fastapi import APIRouter
 
+from core.system_stats import system_stats_sampler
+
 router = APIRouter()
 
 
@@ -21,21 +22,13 @@ async def health_check():
 async def detailed_health_check():
     """상세 헬스체크"""
     try:
-        # 시스템 리소스 정보
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # 시스템 리소스 정보 (백그라운드 샘플러의 마지막 스냅샷)
+        system = system_stats_sampler.snapshot()
         return {
-            "status": "healthy",
+            "status": "healthy" if system else "starting",
             "timestamp": datetime.utcnow().isoformat(),
             "service": "RAG Document Search API",
-            "system": {
-                "cpu_usage_percent": cpu_usage,
-                "memory_usage_percent": memory.percent,
-                "memory_available_mb": memory.available // (1024 * 1024),
-                "disk_usage_percent": disk.percent,
-                "disk_free_gb": disk.free // (1024 * 1024 * 1024)
-            },
+            "system": system,
             "environment": {
                 "python_version": os.sys.version,
                 "platform": os.name
@@ -0,0 +1,46 @@
+import time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.dependencies import get_current_user_id
+from services.query_cache import query_cache
+from services.retrieval import hybrid_search
+
+router = APIRouter()
+
+
+class SearchRequest(BaseModel):
+    """검색 요청"""
+
+    query: str = Field(..., min_length=1, max_length=1000)
+    document_ids: Optional[List[int]] = None
+    max_results: int = Field(5, ge=1, le=50)
+
+
+@router.post("/query")
+async def search_query(
+    request: SearchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """문서 검색 (BM25 + 벡터 하이브리드, 사용자 문서로 한정)"""
+    started = time.perf_counter()
+    document_ids = sorted(set(request.document_ids)) if request.document_ids else None
+    sources = await query_cache.get_or_compute(
+        "search",
+        user_id,
+        request.query,
+        lambda: hybrid_search(
+            db, request.query, user_id, request.max_results, document_ids
+        ),
+        params={"max_results": request.max_results, "document_ids": document_ids},
+    )
+    return {
+        "query": request.query,
+        "sources": sources,
+        "processing_time": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,94 @@
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from services.query_cache import install_version_listeners
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """동기 드라이버 URL 을 대응하는 비동기 드라이버 URL 로 변환"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_options(url: str) -> dict:
+    """SQLite 를 제외한 DB 에 커넥션 풀 설정 적용"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    """SQLite 에서도 ON DELETE CASCADE 가 동작하도록 외래 키 활성화"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class TrackedSession(Session):
+    """문서 변경 시 질의 캐시 버전을 갱신하는 세션"""
+
+
+# 문서/청크 변경 시 사용자별 질의 캐시 버전 갱신
+install_version_listeners(TrackedSession)
+
+# 데이터베이스 엔진 생성
+engine = create_engine(
+    settings.DATABASE_URL, pool_pre_ping=True, **_pool_options(settings.DATABASE_URL)
+)
+
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=TrackedSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# 비동기 엔진: 요청 경로에서 이벤트 루프를 막지 않도록 사용
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    **_pool_options(settings.DATABASE_URL),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=TrackedSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+
+def get_db() -> Iterator[Session]:
+    """요청 단위 DB 세션 의존성"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """요청 단위 비동기 DB 세션 의존성"""
+    async with AsyncSessionLocal() as db:
+        yield db
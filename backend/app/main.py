@@ -1,21 +1,54 @@
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+
+from api import documents, health, search
+from app.config import settings
+from core.metrics import MetricsMiddleware, render_metrics
+from core.system_stats import system_stats_sampler
+from services.ingestion_worker import ingestion_worker
 
 # 환경 변수 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작/종료 시 백그라운드 작업 관리"""
+    system_stats_sampler.start()
+    if settings.INGEST_WORKER_ENABLED:
+        ingestion_worker.start()
+    elif not settings.REDIS_URL:
+        logger.warning(
+            "INGEST_WORKER_ENABLED=false 이고 REDIS_URL 이 없어 "
+            "업로드한 문서가 처리되지 않습니다."
+        )
+    yield
+    if settings.INGEST_WORKER_ENABLED:
+        ingestion_worker.stop()
+    system_stats_sampler.stop()
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="RAG 기반 문서 검색 시스템 API",
     description="AI 기반 문서 검색 및 질의응답 시스템의 백엔드 API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# 라우트별 지연 시간/처리 중 요청 수 수집
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -25,17 +58,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 라우터 포함 (추후 구현)
-# from api import documents, search, auth, users, health
-# app.include_router(health.router, prefix="/api/health", tags=["health"])
+# 라우터 포함
+app.include_router(health.router, prefix="/api/health", tags=["health"])
+app.include_router(
+    documents.router,
+    prefix="/api/documents",
+    tags=["documents"]
+)
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+
+# 추후 구현
+# from api import auth, users
 # app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 # app.include_router(users.router, prefix="/api/users", tags=["users"])
-# app.include_router(
-#     documents.router,
-#     prefix="/api/documents",
-#     tags=["documents"]
-# )
-# app.include_router(search.router, prefix="/api/search", tags=["search"])
 
 
 @app.get("/")
@@ -50,6 +85,13 @@ async def health_check():
     return {"status": "healthy", "message": "API 서버가 정상적으로 작동 중입니다."}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 메트릭 엔드포인트"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """전역 예외 처리"""
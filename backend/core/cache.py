@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+from core.metrics import CACHE_ENTRIES, CACHE_EVENTS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """크기 제한이 있는 스레드 안전 LRU 캐시
+
+    ``name`` 을 주면 축출 수와 항목 수를 Prometheus 로도 내보낸다.
+    """
+
+    def __init__(self, max_size: int, name: Optional[str] = None):
+        self.max_size = max_size
+        self._items: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._evictions_metric = CACHE_EVENTS.labels(name, "eviction") if name else None
+        self._entries_metric = CACHE_ENTRIES.labels(name) if name else None
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+                if self._evictions_metric is not None:
+                    self._evictions_metric.inc()
+            self._report_size()
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._items.pop(key, None)
+            self._report_size()
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._report_size()
+
+    def _report_size(self) -> None:
+        if self._entries_metric is not None:
+            self._entries_metric.set(len(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, int]:
+        """적중/미스/축출 카운터"""
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
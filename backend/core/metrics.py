@@ -0,0 +1,206 @@
+import functools
+import inspect
+import os
+import time
+from typing import Callable, Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# p95 5초 목표 주변을 촘촘하게 보도록 구간 설정
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.0,
+    3.0,
+    5.0,
+    7.5,
+    10.0,
+    30.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "처리 중인 HTTP 요청 수",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds",
+    "업로드·임베딩·벡터 검색·LLM 등 단계별 처리 시간",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "rag_stage_errors_total",
+    "단계별 실패 횟수",
+    ["stage"],
+)
+INGEST_CHUNKS = Counter(
+    "rag_ingest_chunks_total",
+    "문서 처리 시 청크 수 (reused: 기존 임베딩 재사용, embedded: 새로 임베딩, "
+    "removed: 새 버전에 없어 삭제)",
+    ["result"],
+)
+CACHE_EVENTS = Counter(
+    "rag_cache_events_total",
+    "캐시 이벤트 수 (cache: query·embedding, event: hit·miss·redis_hit·coalesced·"
+    "store·bypassed·eviction). 적중률은 hit+redis_hit 를 조회 합계로 나눠 구한다",
+    ["cache", "event"],
+)
+CACHE_ENTRIES = Gauge(
+    "rag_cache_entries",
+    "프로세스 내 LRU 캐시 항목 수",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "rag_embedding_batch_size",
+    "임베딩 제공자 호출 한 번에 보낸 텍스트 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class stage_timer:
+    """단계 처리 시간을 기록하는 타이머
+
+    ``with``/``async with`` 블록이나 동기·비동기 함수 데코레이터로 쓴다::
+
+        async with stage_timer("vector_search"):
+            ...
+
+        @stage_timer("embedding")
+        async def embed(...): ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started: Optional[float] = None
+
+    def __enter__(self) -> "stage_timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        started, self._started = self._started, None
+        if started is None:
+            raise RuntimeError(f"시작하지 않은 단계 타이머입니다: {self.stage}")
+        STAGE_LATENCY.labels(self.stage).observe(time.perf_counter() - started)
+        if exc_type is not None:
+            STAGE_ERRORS.labels(self.stage).inc()
+
+    async def __aenter__(self) -> "stage_timer":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, func: Callable) -> Callable:
+        stage = self.stage
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with stage_timer(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def _route_label(router: Router, scope: Scope) -> str:
+    """경로 변수 대신 라우트 템플릿을 라벨로 사용 (카디널리티 제한)"""
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """라우트별 지연 시간 히스토그램과 처리 중 요청 수를 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app: ASGIApp, router: Router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_label(self.router, scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+
+def metrics_registry() -> CollectorRegistry:
+    """노출할 레지스트리
+
+    PROMETHEUS_MULTIPROC_DIR 이 설정된 다중 프로세스 환경(uvicorn 워커, 수집
+    워커의 문서 처리 프로세스)에서는 모든 프로세스의 값을 합산한다.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def mark_processes_dead(pids: Iterable[int]) -> None:
+    """종료된 프로세스의 livesum 게이지 값을 합산에서 제외"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        for pid in pids:
+            multiprocess.mark_process_dead(pid)
+
+
+def render_metrics() -> tuple:
+    """Prometheus 노출 형식 (본문, content-type)"""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
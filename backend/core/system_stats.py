@@ -0,0 +1,65 @@
+import threading
+from datetime import datetime
+from typing import Optional
+
+import psutil  # type: ignore  # Library stubs not installed for "psutil"
+
+FIRST_SAMPLE_INTERVAL = 0.5
+
+
+class SystemStatsSampler:
+    """시스템 리소스를 백그라운드 스레드에서 주기적으로 수집
+
+    ``psutil.cpu_percent(interval=...)`` 처럼 대기가 필요한 측정을
+    요청 처리 경로에서 분리하고, 헬스체크는 마지막 스냅샷만 읽는다.
+    """
+
+    def __init__(self, interval: float = 5.0, disk_path: str = "/"):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._snapshot: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="system-stats-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def snapshot(self) -> Optional[dict]:
+        """마지막 수집 결과 (아직 없으면 None)"""
+        with self._lock:
+            return dict(self._snapshot) if self._snapshot else None
+
+    def _run(self) -> None:
+        # 첫 CPU 측정은 기준점이 필요하므로 이 스레드에서만 잠시 대기한다
+        self._sample(psutil.cpu_percent(interval=FIRST_SAMPLE_INTERVAL))
+        while not self._stop.wait(self.interval):
+            self._sample(psutil.cpu_percent(interval=None))
+
+    def _sample(self, cpu_usage: float) -> None:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        snapshot = {
+            "cpu_usage_percent": cpu_usage,
+            "memory_usage_percent": memory.percent,
+            "memory_available_mb": memory.available // (1024 * 1024),
+            "disk_usage_percent": disk.percent,
+            "disk_free_gb": disk.free // (1024 * 1024 * 1024),
+            "sampled_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+
+
+system_stats_sampler = SystemStatsSampler()
@@ -0,0 +1,84 @@
+import enum
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class VectorDType(str, enum.Enum):
+    """임베딩 저장 자료형"""
+
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+
+_NUMPY_DTYPES: Dict[VectorDType, np.dtype] = {
+    VectorDType.FLOAT32: np.dtype("<f4"),
+    VectorDType.FLOAT16: np.dtype("<f2"),
+    VectorDType.INT8: np.dtype("i1"),
+}
+
+_INT8_MAX = 127.0
+
+
+def numpy_dtype(dtype: VectorDType) -> np.dtype:
+    """저장 자료형에 대응하는 리틀엔디언 numpy dtype"""
+    return _NUMPY_DTYPES[VectorDType(dtype)]
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """행 단위 대칭 int8 양자화 (값, 스케일) 반환"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / _INT8_MAX
+    scales[scales == 0] = 1.0
+    quantized = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def encode_matrix(
+    matrix: np.ndarray,
+    dtype: VectorDType = VectorDType.FLOAT32,
+) -> Tuple[List[bytes], List[float]]:
+    """행렬의 각 행을 패킹된 바이트와 스케일로 인코딩"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    if VectorDType(dtype) is VectorDType.INT8:
+        packed, scales = quantize_int8(matrix)
+    else:
+        packed = matrix.astype(numpy_dtype(dtype))
+        scales = np.ones(len(matrix), dtype=np.float32)
+    packed = np.ascontiguousarray(packed)
+    return [row.tobytes() for row in packed], scales.tolist()
+
+
+def decode_matrix(
+    blobs: Sequence[bytes],
+    dim: int,
+    dtype: VectorDType = VectorDType.FLOAT32,
+    scales: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """동일 자료형 바이트 목록을 연속된 float32 행렬로 복원
+
+    바이트를 한 번에 이어 붙인 뒤 ``np.frombuffer`` 로 해석하므로
+    행마다 파이썬 float 객체를 만들지 않는다.
+    """
+    np_dtype = numpy_dtype(dtype)
+    buffer = b"".join(blobs)
+    expected = len(blobs) * dim * np_dtype.itemsize
+    if len(buffer) != expected:
+        raise ValueError(f"벡터 바이트 길이 불일치: {len(buffer)} != {expected}")
+    packed = np.frombuffer(buffer, dtype=np_dtype).reshape(len(blobs), dim)
+    if VectorDType(dtype) is VectorDType.INT8:
+        factors = np.asarray(
+            scales if scales is not None else np.ones(len(blobs)),
+            dtype=np.float32,
+        )
+        return packed.astype(np.float32) * factors[:, None]
+    if np_dtype == np.float32:
+        return packed
+    return packed.astype(np.float32)
+
+
+def parse_json_vector(text: str) -> np.ndarray:
+    """레거시 JSON 텍스트 벡터를 float32 배열로 변환"""
+    return np.asarray(json.loads(text), dtype=np.float32)
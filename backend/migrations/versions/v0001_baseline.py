@@ -0,0 +1,91 @@
+"""초기 스키마 (users, documents, document_chunks)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+마이그레이션 도입 전 ``create_all`` 로 만든 DB 는 ``alembic stamp 0001`` 후
+``alembic upgrade head`` 로 올린다. 외래 키 이름은 PostgreSQL 기본 이름과
+같게 지정해 이후 마이그레이션이 기존 DB 에서도 제약 조건을 찾을 수 있다.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps() -> list:
+    return [
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(255), nullable=True),
+        sa.Column(
+            "role",
+            sa.Enum("ADMIN", "EDITOR", "VIEWER", name="userrole"),
+            nullable=True,
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_verified", sa.Boolean(), nullable=True),
+        *_timestamps(),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("file_size", sa.Integer(), nullable=False),
+        sa.Column("file_type", sa.String(50), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("is_processed", sa.Boolean(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="documents_user_id_fkey"
+        ),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+    op.create_table(
+        "document_chunks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("embedding_vector", sa.Text(), nullable=True),
+        sa.Column("page_number", sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(
+            ["document_id"],
+            ["documents.id"],
+            name="document_chunks_document_id_fkey",
+        ),
+    )
+    op.create_index("ix_document_chunks_id", "document_chunks", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("document_chunks")
+    op.drop_table("documents")
+    op.drop_table("users")
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,91 @@
+"""청크 임베딩을 패킹된 바이너리 컬럼으로 저장
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+스키마만 바꾼다. 기존 JSON 임베딩(embedding_vector)은 수집 워커가 시작할 때
+``migrate_json_embeddings`` 로 배치마다 커밋하며 바이너리 컬럼으로 옮기므로
+중단돼도 남은 행부터 이어서 변환한다. 변환한 행의 JSON 값은 비운다.
+
+되돌릴 때는 바이너리로만 남은 임베딩을 JSON 으로 다시 써 둔 뒤 컬럼을 지운다.
+"""
+
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from core.vectors import VectorDType, decode_matrix
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# 이 리비전 시점의 document_chunks (현재 ORM 모델과 무관하게 고정)
+_chunks = sa.table(
+    "document_chunks",
+    sa.column("id", sa.Integer),
+    sa.column("embedding_vector", sa.Text),
+    sa.column("embedding", sa.LargeBinary),
+    sa.column("embedding_dim", sa.Integer),
+    sa.column("embedding_dtype", sa.String),
+    sa.column("embedding_scale", sa.Float),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("document_chunks") as batch:
+        batch.add_column(sa.Column("embedding", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("embedding_dim", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("embedding_dtype", sa.String(16), nullable=True))
+        batch.add_column(sa.Column("embedding_scale", sa.Float(), nullable=True))
+
+
+def _restore_json_embeddings() -> None:
+    """바이너리로만 저장된 임베딩을 embedding_vector 에 JSON 으로 기록"""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                _chunks.c.id,
+                _chunks.c.embedding,
+                _chunks.c.embedding_dim,
+                _chunks.c.embedding_dtype,
+                _chunks.c.embedding_scale,
+            )
+            .where(_chunks.c.id > last_id)
+            .where(_chunks.c.embedding.is_not(None))
+            .where(_chunks.c.embedding_vector.is_(None))
+            .order_by(_chunks.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        for row in rows:
+            vector = decode_matrix(
+                [row.embedding],
+                row.embedding_dim,
+                VectorDType(row.embedding_dtype),
+                [row.embedding_scale],
+            )[0]
+            bind.execute(
+                sa.update(_chunks)
+                .where(_chunks.c.id == row.id)
+                .values(embedding_vector=json.dumps(vector.tolist()))
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    _restore_json_embeddings()
+    with op.batch_alter_table("document_chunks") as batch:
+        batch.drop_column("embedding_scale")
+        batch.drop_column("embedding_dtype")
+        batch.drop_column("embedding_dim")
+        batch.drop_column("embedding")
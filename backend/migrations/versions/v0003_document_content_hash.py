@@ -0,0 +1,30 @@
+"""업로드 파일 SHA-256 으로 중복 업로드 판별
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+기존 문서는 해시가 비어 있으므로 중복 판별 대상에서 빠진다.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("content_hash", sa.String(64), nullable=True))
+        batch.create_index("ix_documents_content_hash", ["content_hash"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_index("ix_documents_content_hash")
+        batch.drop_column("content_hash")
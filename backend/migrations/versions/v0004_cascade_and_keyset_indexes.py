@@ -0,0 +1,52 @@
+"""외래 키 ON DELETE CASCADE 와 키셋 페이지네이션 인덱스
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+사용자·문서를 지울 때 하위 행을 DB 가 함께 지우도록 외래 키를 다시 만들고,
+목록 조회가 쓰는 ``(user_id, id)``, ``(document_id, chunk_index)`` 복합
+인덱스를 추가한다.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_FOREIGN_KEYS = (
+    # (테이블, 제약 조건 이름, 컬럼, 참조 테이블)
+    ("documents", "documents_user_id_fkey", "user_id", "users"),
+    ("document_chunks", "document_chunks_document_id_fkey", "document_id", "documents"),
+)
+
+
+def _recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    for table, name, column, referent in _FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch:
+            batch.drop_constraint(name, type_="foreignkey")
+            batch.create_foreign_key(
+                name, referent, [column], ["id"], ondelete=ondelete
+            )
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys("CASCADE")
+    op.create_index("ix_documents_user_id_id", "documents", ["user_id", "id"])
+    op.create_index(
+        "ix_document_chunks_document_id_chunk_index",
+        "document_chunks",
+        ["document_id", "chunk_index"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_document_chunks_document_id_chunk_index", table_name="document_chunks"
+    )
+    op.drop_index("ix_documents_user_id_id", table_name="documents")
+    _recreate_foreign_keys(None)
@@ -0,0 +1,34 @@
+"""개정판 업로드의 증분 재처리용 컬럼
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+청크 본문 SHA-256 으로 기존 청크와 임베딩을 재사용하고, 교체된 이전 파일
+위치를 처리 작업이 끝날 때까지 보관한다. 기존 청크의 해시는 다음 재처리
+때 채워진다.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("document_chunks") as batch:
+        batch.add_column(sa.Column("content_hash", sa.String(64), nullable=True))
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("stale_file_paths", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("stale_file_paths")
+    with op.batch_alter_table("document_chunks") as batch:
+        batch.drop_column("content_hash")
@@ -0,0 +1,42 @@
+"""청크 키셋 인덱스에 id 추가
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+``chunk_index`` 는 문서 안에서 유일하지 않아 청크 목록 커서를
+``(chunk_index, id)`` 로 바꿨다. 정렬과 범위 조건을 인덱스만으로 처리하도록
+``(document_id, chunk_index)`` 인덱스를 ``(document_id, chunk_index, id)`` 로
+교체한다.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_document_chunks_document_id_chunk_index_id",
+        "document_chunks",
+        ["document_id", "chunk_index", "id"],
+    )
+    op.drop_index(
+        "ix_document_chunks_document_id_chunk_index", table_name="document_chunks"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_document_chunks_document_id_chunk_index",
+        "document_chunks",
+        ["document_id", "chunk_index"],
+    )
+    op.drop_index(
+        "ix_document_chunks_document_id_chunk_index_id", table_name="document_chunks"
+    )
@@ -1,5 +1,9 @@
-from sqlalchemy import Column, DateTime, Integer
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import DateTime, Integer
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
 Base = declarative_base()  # noqa
@@ -11,18 +15,47 @@ class BaseModel(Base):  # type: ignore
     """기본 모델 클래스"""
     __abstract__ = True
   
-    id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=func.now(),
         onupdate=func.now(),
         nullable=False,
     )
    
-    def to_dict(self):
-        """모델을 딕셔너리로 변환"""
+    # 기본 직렬화에서 제외할 대용량 컬럼
+    __large_columns__: Tuple[str, ...] = ()
+
+    @classmethod
+    def _column_keys(cls, include_large: bool) -> Tuple[str, ...]:
+        """직렬화 대상 컬럼 키 (클래스별 캐시)"""
+        cache = cls.__dict__.get("_column_keys_cache")
+        if cache is None:
+            cache = {}
+            setattr(cls, "_column_keys_cache", cache)
+        keys = cache.get(include_large)
+        if keys is None:
+            keys = tuple(
+                column.key
+                for column in cls.__table__.columns
+                if include_large or column.key not in cls.__large_columns__
+            )
+            cache[include_large] = keys
+        return keys
+
+    def to_dict(self, include_large: bool = False):
+        """모델을 딕셔너리로 변환
+
+        이미 로드된 컬럼만 인스턴스 ``__dict__`` 에서 바로 읽으므로
+        지연 로딩 쿼리가 발생하지 않으며, ``__large_columns__`` 는
+        ``include_large=True`` 일 때만 포함한다.
+        """
+        state = self.__dict__
         return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
+            key: state[key]
+            for key in self._column_keys(include_large)
+            if key in state
         } 
\ No newline at end of file
@@ -1,40 +1,96 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel  # type: ignore
 
+if TYPE_CHECKING:
+    from .user import User
+
 
 class Document(BaseModel):
     """문서 모델"""
     __tablename__ = "documents"
+    __table_args__ = (
+        # 사용자별 최신순 키셋 페이지네이션용
+        Index("ix_documents_user_id_id", "user_id", "id"),
+    )
+    __large_columns__ = ("content",)
     
-    title = Column(String(255), nullable=False)
-    filename = Column(String(255), nullable=False)
-    file_path = Column(String(500), nullable=False)
-    file_size = Column(Integer, nullable=False)
-    file_type = Column(String(50), nullable=False)
-    content = Column(Text, nullable=True)
-    is_processed = Column(Boolean, default=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    file_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, index=True
+    )  # SHA-256
+    is_processed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    # 교체된 이전 파일 위치 (JSON 목록, 처리 작업이 끝나면 워커가 삭제)
+    stale_file_paths: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
 
     # 관계 설정
-    user = relationship("User", back_populates="documents")
-    chunks = relationship(
+    user: Mapped["User"] = relationship("User", back_populates="documents")
+    chunks: Mapped[List["DocumentChunk"]] = relationship(
         "DocumentChunk",
         back_populates="document",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # 청크 삭제는 DB 의 ON DELETE CASCADE 에 맡김
+        order_by="DocumentChunk.chunk_index",
     )
 
 
 class DocumentChunk(BaseModel):
     """문서 청크 모델"""
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index(
+            "ix_document_chunks_document_id_chunk_index_id",
+            "document_id",
+            "chunk_index",
+            "id",
+        ),
+    )
+    __large_columns__ = ("content", "embedding_vector", "embedding")
     
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
-    chunk_index = Column(Integer, nullable=False)
-    content = Column(Text, nullable=False)
-    embedding_vector = Column(Text, nullable=True)  # JSON 형태로 저장
-    page_number = Column(Integer, nullable=True)
+    document_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True
+    )  # 증분 재처리용 SHA-256
+    embedding_vector: Mapped[Optional[str]] = mapped_column(
+        Text, nullable=True
+    )  # (레거시) JSON 형태
+    embedding: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True
+    )  # 패킹된 벡터 바이트
+    embedding_dim: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    embedding_dtype: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    embedding_scale: Mapped[Optional[float]] = mapped_column(
+        Float, nullable=True
+    )  # int8 양자화 스케일
+    page_number: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # 관계 설정
-    document = relationship("Document", back_populates="chunks") 
\ No newline at end of file
+    document: Mapped["Document"] = relationship("Document", back_populates="chunks")
@@ -1,10 +1,14 @@
 import enum
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, Column, Enum, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Enum, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel  # type: ignore
 
+if TYPE_CHECKING:
+    from .document import Document
+
 
 class UserRole(enum.Enum):
     """사용자 역할"""
@@ -17,20 +21,25 @@ class User(BaseModel):
     """사용자 모델"""
     __tablename__ = "users"
     
-    email = Column(String(255), unique=True, index=True, nullable=False)
-    username = Column(String(100), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    full_name = Column(String(255), nullable=True)
-    role: Column = Column(
+    email: Mapped[str] = mapped_column(
+        String(255), unique=True, index=True, nullable=False
+    )
+    username: Mapped[str] = mapped_column(
+        String(100), unique=True, index=True, nullable=False
+    )
+    hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
+    full_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    role: Mapped[Optional[UserRole]] = mapped_column(
         Enum(UserRole),
         default=UserRole.VIEWER
     )
-    is_active = Column(Boolean, default=True)
-    is_verified = Column(Boolean, default=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_verified: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
 
     # 관계 설정
-    documents = relationship(
+    documents: Mapped[List["Document"]] = relationship(
         "Document",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     ) 
\ No newline at end of file
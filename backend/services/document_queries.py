@@ -0,0 +1,170 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, defer, load_only, selectinload
+
+from models.document import Document, DocumentChunk  # type: ignore
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """잘못된 페이지 커서"""
+
+
+def encode_cursor(*values) -> str:
+    """키셋 위치를 불투명한 URL-safe 문자열로 인코딩"""
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("잘못된 커서입니다.") from e
+    if not isinstance(values, list):
+        raise InvalidCursor("잘못된 커서입니다.")
+    return values
+
+
+def _decode_ints(cursor: str, count: int) -> List[int]:
+    """정수 ``count`` 개로 이뤄진 커서를 복원"""
+    values = decode_cursor(cursor)
+    if len(values) != count:
+        raise InvalidCursor("잘못된 커서입니다.")
+    try:
+        return [int(value) for value in values]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("잘못된 커서입니다.") from e
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+async def list_documents(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[Document, int]], Optional[str]]:
+    """사용자 문서 목록 (최신순 키셋 페이지네이션)
+
+    OFFSET 대신 마지막 문서 id 를 커서로 넘겨 페이지가 깊어져도
+    ``(user_id, id)`` 인덱스 범위 탐색 한 번으로 끝난다. id 는 생성 순서로
+    증가하므로 최신순과 같고, 초 단위로 저장되는 ``created_at`` 과 달리
+    중복이 없다. 청크 수는 페이지에 담긴 문서마다 상관 서브쿼리로 세므로
+    ``(document_id, chunk_index)`` 인덱스에서 해당 문서 범위만 읽고, 본문
+    컬럼은 읽지 않는다.
+    """
+    limit = _page_size(limit)
+    chunk_count = (
+        select(func.count(DocumentChunk.id))
+        .where(DocumentChunk.document_id == Document.id)
+        .correlate(Document)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(Document, chunk_count)
+        .options(defer(Document.content))
+        .where(Document.user_id == user_id)
+        .order_by(Document.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        (last_id,) = _decode_ints(cursor, 1)
+        stmt = stmt.where(Document.id < last_id)
+
+    rows = [(doc, count) for doc, count in (await db.execute(stmt)).all()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.id)
+    return rows, next_cursor
+
+
+async def fetch_chunks(
+    db: AsyncSession,
+    document_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    include_content: bool = True,
+    include_embedding: bool = False,
+) -> Tuple[List[DocumentChunk], Optional[str]]:
+    """문서 청크를 ``(chunk_index, id)`` 순으로 키셋 페이지 조회
+
+    ``chunk_index`` 는 유일하지 않으므로 (페이지별 청크 번호 등) 커서는
+    마지막 청크의 ``(chunk_index, id)`` 쌍이다. ``(document_id, chunk_index,
+    id)`` 인덱스를 따라 읽으며, 필요 없는 본문과 임베딩 컬럼은 SELECT 목록에서
+    뺀다. 두 번째 값은 다음 페이지 커서이다.
+    """
+    limit = _page_size(limit)
+    columns: List[QueryableAttribute[Any]] = [
+        DocumentChunk.id,
+        DocumentChunk.document_id,
+        DocumentChunk.chunk_index,
+        DocumentChunk.page_number,
+        DocumentChunk.created_at,
+        DocumentChunk.updated_at,
+    ]
+    if include_content:
+        columns.append(DocumentChunk.content)
+    if include_embedding:
+        columns.extend(
+            [
+                DocumentChunk.embedding,
+                DocumentChunk.embedding_dim,
+                DocumentChunk.embedding_dtype,
+                DocumentChunk.embedding_scale,
+            ]
+        )
+    stmt = (
+        select(DocumentChunk)
+        .options(load_only(*columns))
+        .where(DocumentChunk.document_id == document_id)
+        .order_by(DocumentChunk.chunk_index, DocumentChunk.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        last_index, last_id = _decode_ints(cursor, 2)
+        stmt = stmt.where(
+            tuple_(DocumentChunk.chunk_index, DocumentChunk.id)
+            > tuple_(literal(last_index), literal(last_id))
+        )
+
+    chunks = list((await db.execute(stmt)).scalars().all())
+    next_cursor = None
+    if len(chunks) > limit:
+        chunks = chunks[:limit]
+        next_cursor = encode_cursor(chunks[-1].chunk_index, chunks[-1].id)
+    return chunks, next_cursor
+
+
+async def get_document_with_chunks(
+    db: AsyncSession, document_id: int, user_id: int
+) -> Optional[Document]:
+    """문서와 청크 목록을 함께 로드
+
+    청크는 ``selectinload`` 로 IN 쿼리 한 번에 가져오며 본문·임베딩 컬럼은
+    제외한다.
+    """
+    stmt = (
+        select(Document)
+        .options(
+            defer(Document.content),
+            selectinload(Document.chunks).load_only(
+                DocumentChunk.id,
+                DocumentChunk.chunk_index,
+                DocumentChunk.page_number,
+            ),
+        )
+        .where(Document.id == document_id)
+        .where(Document.user_id == user_id)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
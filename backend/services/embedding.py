@@ -0,0 +1,393 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from core.cache import LRUCache
+from core.metrics import CACHE_EVENTS, EMBEDDING_BATCH_SIZE, stage_timer
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_SECONDS = 30.0
+
+
+def content_key(text: str) -> str:
+    """임베딩 캐시 키로 쓰는 텍스트 SHA-256"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingProvider(ABC):
+    """임베딩 생성기 인터페이스"""
+
+    name: str
+    dim: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """텍스트 목록을 (len(texts), dim) float32 행렬로 변환"""
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI 임베딩 API"""
+
+    def __init__(self, model: str, dim: int):
+        from openai import AsyncOpenAI  # type: ignore
+
+        self.name = f"openai:{model}"
+        self.model = model
+        self.dim = dim
+        self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        response = await self._client.embeddings.create(model=self.model, input=texts)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in data], dtype=np.float32)
+
+
+class LocalHashEmbeddingProvider(EmbeddingProvider):
+    """네트워크 없이 쓰는 결정적 임베딩 (문자 n-gram 해싱)
+
+    같은 텍스트는 프로세스와 무관하게 항상 같은 벡터가 되므로 개발,
+    테스트, 벤치마크용으로 사용한다.
+    """
+
+    def __init__(self, dim: int, ngram_sizes: Tuple[int, ...] = (2, 3)):
+        self.name = f"local-hash:{dim}"
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.to_thread(self.embed_sync, texts)
+
+    def embed_sync(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(gram.encode("utf-8")) for gram in self._ngrams(text)),
+                dtype=np.uint32,
+            )
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dim, signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _ngrams(self, text: str):
+        normalized = " ".join(text.lower().split())
+        for size in self.ngram_sizes:
+            for start in range(max(len(normalized) - size + 1, 1)):
+                yield normalized[start : start + size]
+
+
+class EmbeddingCache:
+    """프로세스 내 LRU + Redis 2단계 임베딩 캐시
+
+    Redis 장애 시에는 경고만 남기고 일정 시간 LRU 만 사용한다.
+    """
+
+    def __init__(self, namespace: str, max_size: int, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local: LRUCache[str, np.ndarray] = LRUCache(max_size, name="embedding")
+        self.redis_hits = 0
+        self._hit_metric = CACHE_EVENTS.labels("embedding", "hit")
+        self._redis_hit_metric = CACHE_EVENTS.labels("embedding", "redis_hit")
+        self._miss_metric = CACHE_EVENTS.labels("embedding", "miss")
+        self._redis_clients: Dict[asyncio.AbstractEventLoop, object] = {}
+        self._redis_disabled_until = 0.0
+
+    def _redis(self):
+        if not settings.REDIS_URL or time.monotonic() < self._redis_disabled_until:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._redis_clients.get(loop)
+        if client is None:
+            import redis.asyncio as redis  # type: ignore
+
+            for old in [old for old in self._redis_clients if old.is_closed()]:
+                del self._redis_clients[old]
+            client = redis.from_url(settings.REDIS_URL)
+            self._redis_clients[loop] = client
+        return client
+
+    def _redis_failed(self, error: Exception) -> None:
+        now = time.monotonic()
+        if now >= self._redis_disabled_until:
+            # 동시에 실패한 요청들이 같은 경고를 반복하지 않도록 한 번만 기록
+            logger.warning("Redis 임베딩 캐시 사용 불가: %s", error)
+        self._redis_disabled_until = now + REDIS_RETRY_SECONDS
+
+    def _redis_key(self, key: str) -> str:
+        return f"emb:{self.namespace}:{key}"
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = await self._lookup(keys)
+        self._miss_metric.inc(len(keys) - len(found))
+        return found
+
+    async def _lookup(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+        for key in keys:
+            vector = self.local.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+        self._hit_metric.inc(len(found))
+        client = self._redis() if missing else None
+        if client is None:
+            return found
+        try:
+            values = await client.mget([self._redis_key(k) for k in missing])
+        except Exception as e:
+            self._redis_failed(e)
+            return found
+        for key, value in zip(missing, values):
+            if value is None:
+                continue
+            vector = np.frombuffer(value, dtype="<f4")
+            self.local.set(key, vector)
+            found[key] = vector
+            self.redis_hits += 1
+            self._redis_hit_metric.inc()
+        return found
+
+    async def set_many(self, items: Dict[str, np.ndarray]) -> None:
+        for key, vector in items.items():
+            self.local.set(key, vector)
+        client = self._redis()
+        if client is None or not items:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, vector in items.items():
+                    pipe.set(
+                        self._redis_key(key),
+                        np.asarray(vector, dtype="<f4").tobytes(),
+                        ex=self.ttl,
+                    )
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+
+@dataclass
+class _LoopState:
+    """이벤트 루프마다 따로 두는 배처 상태"""
+
+    queue: "asyncio.Queue[Tuple[str, str]]"
+    semaphore: asyncio.Semaphore
+    pending: Dict[str, "asyncio.Future[np.ndarray]"] = field(default_factory=dict)
+    worker: Optional["asyncio.Task[None]"] = None
+    # 실행 중인 디스패치 태스크 (이벤트 루프는 약한 참조만 유지한다)
+    dispatches: Set["asyncio.Task[None]"] = field(default_factory=set)
+
+
+class EmbeddingService:
+    """임베딩 요청 마이크로 배처
+
+    동시에 들어온 요청을 최대 ``max_batch_size`` 개 또는 ``max_wait``
+    초까지 모아 한 번에 호출하고, 동시에 진행 중인 호출 수는
+    ``max_in_flight`` 로 제한한다. 동일 텍스트는 내용 해시로 합쳐지며
+    캐시에 있으면 제공자를 호출하지 않는다.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache: EmbeddingCache,
+        max_batch_size: int = 64,
+        max_wait: float = 0.01,
+        max_in_flight: int = 4,
+    ):
+        self.provider = provider
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.requested_texts = 0
+        self.provider_calls = 0
+        self.provider_texts = 0
+        self._states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+
+    @property
+    def dim(self) -> int:
+        return self.provider.dim
+
+    async def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """텍스트 목록 임베딩 (입력 순서 유지)"""
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        keys = [content_key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+        self.requested_texts += len(texts)
+
+        found = await self.cache.get_many(list(unique))
+        missing = [key for key in unique if key not in found]
+        if missing:
+            # 같은 텍스트를 기다리는 다른 호출과 future 를 공유하므로, 이 호출이
+            # 취소돼도 공유 future 는 취소되지 않도록 shield 로 감싼다
+            vectors = await asyncio.gather(
+                *(asyncio.shield(self._submit(key, unique[key])) for key in missing)
+            )
+            found.update(zip(missing, vectors))
+        return np.vstack([found[key] for key in keys])
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """단일 쿼리 임베딩"""
+        return (await self.embed_texts([text]))[0]
+
+    def stats(self) -> dict:
+        """비용 절감 확인용 카운터"""
+        return {
+            "requested_texts": self.requested_texts,
+            "provider_calls": self.provider_calls,
+            "provider_texts": self.provider_texts,
+            "redis_hits": self.cache.redis_hits,
+            "local_cache": self.cache.local.stats(),
+        }
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            # 종료된 루프의 상태는 정리한다 (asyncio.run 반복 호출 대비)
+            for old in [old for old in self._states if old.is_closed()]:
+                del self._states[old]
+            state = _LoopState(asyncio.Queue(), asyncio.Semaphore(self.max_in_flight))
+            self._states[loop] = state
+        if state.worker is None or state.worker.done():
+            state.worker = loop.create_task(self._collect(state))
+        return state
+
+    def _submit(self, key: str, text: str) -> "asyncio.Future[np.ndarray]":
+        state = self._state()
+        future = state.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            state.pending[key] = future
+            state.queue.put_nowait((key, text))
+        return future
+
+    async def _collect(self, state: _LoopState) -> None:
+        """큐에서 배치를 모아 세마포어 한도 안에서 디스패치"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await state.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(state.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await state.semaphore.acquire()
+            task = loop.create_task(self._dispatch(state, batch))
+            state.dispatches.add(task)
+            task.add_done_callback(state.dispatches.discard)
+
+    async def _dispatch(self, state: _LoopState, batch: List[Tuple[str, str]]) -> None:
+        keys = [key for key, _ in batch]
+        try:
+            self.provider_calls += 1
+            self.provider_texts += len(batch)
+            EMBEDDING_BATCH_SIZE.observe(len(batch))
+            async with stage_timer("embedding"):
+                vectors = await self.provider.embed([text for _, text in batch])
+            results = dict(zip(keys, vectors))
+            await self.cache.set_many(results)
+            for key in keys:
+                future = state.pending.pop(key)
+                if not future.done():
+                    future.set_result(results[key])
+        except Exception as e:
+            for key in keys:
+                waiter = state.pending.pop(key, None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_exception(e)
+        finally:
+            state.semaphore.release()
+
+
+def create_provider() -> EmbeddingProvider:
+    """EMBEDDING_PROVIDER 설정에 맞는 임베딩 제공자 생성"""
+    if settings.EMBEDDING_PROVIDER == "local":
+        return LocalHashEmbeddingProvider(settings.EMBEDDING_DIM)
+    if settings.EMBEDDING_PROVIDER == "openai":
+        return OpenAIEmbeddingProvider(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIM)
+    raise ValueError(
+        f"지원하지 않는 임베딩 제공자입니다: {settings.EMBEDDING_PROVIDER}"
+    )
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """프로세스 전역 임베딩 서비스"""
+    global _service
+    if _service is None:
+        provider = create_provider()
+        _service = EmbeddingService(
+            provider,
+            EmbeddingCache(
+                provider.name,
+                settings.EMBEDDING_CACHE_SIZE,
+                settings.EMBEDDING_CACHE_TTL,
+            ),
+            max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_wait=settings.EMBEDDING_BATCH_WAIT_MS / 1000,
+            max_in_flight=settings.EMBEDDING_MAX_IN_FLIGHT,
+        )
+    return _service
+
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """동기 호출용으로 프로세스마다 하나 띄워 두는 이벤트 루프
+
+    호출마다 새 루프를 만들면 배처 상태와 Redis 클라이언트가 루프마다
+    새로 생기고 닫히지 않으므로, 한 루프를 계속 재사용한다.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="embedding-loop", daemon=True
+            ).start()
+            _sync_loop = loop
+    return _sync_loop
+
+
+def embed_texts_sync(texts: Sequence[str]) -> np.ndarray:
+    """동기 코드(스레드풀, 워커 프로세스)에서 임베딩 호출
+
+    AnyIO 워커 스레드라면 메인 이벤트 루프의 배처와 캐시를 공유하고,
+    그 밖의 경우 프로세스 공용 백그라운드 루프에서 실행한다.
+    """
+    import anyio.from_thread
+
+    service = get_embedding_service()
+    try:
+        anyio.from_thread.run_sync(lambda: None)
+    except RuntimeError:
+        future = asyncio.run_coroutine_threadsafe(
+            service.embed_texts(texts), _background_loop()
+        )
+        return future.result()
+    return anyio.from_thread.run(service.embed_texts, texts)
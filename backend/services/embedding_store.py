@@ -0,0 +1,174 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from core.vectors import (
+    VectorDType,
+    decode_matrix,
+    encode_matrix,
+    parse_json_vector,
+)
+from models.document import DocumentChunk  # type: ignore
+
+DEFAULT_BATCH_SIZE = 500
+
+_EMBEDDING_COLUMNS = (
+    DocumentChunk.id,
+    DocumentChunk.embedding,
+    DocumentChunk.embedding_dim,
+    DocumentChunk.embedding_dtype,
+    DocumentChunk.embedding_scale,
+)
+
+
+def _rows_to_matrix(rows: List[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """(id, 바이트, 차원, 자료형, 스케일) 행을 하나의 float32 행렬로 결합"""
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32), ids
+    dims = {row[2] for row in rows}
+    if len(dims) != 1:
+        raise ValueError(f"임베딩 차원이 섞여 있습니다: {sorted(dims)}")
+    dim = dims.pop()
+
+    groups: Dict[str, List[int]] = {}
+    for position, row in enumerate(rows):
+        groups.setdefault(row[3], []).append(position)
+    if len(groups) == 1:
+        dtype = next(iter(groups))
+        return (
+            decode_matrix(
+                [row[1] for row in rows],
+                dim,
+                VectorDType(dtype),
+                [row[4] for row in rows],
+            ),
+            ids,
+        )
+
+    matrix = np.empty((len(rows), dim), dtype=np.float32)
+    for dtype, positions in groups.items():
+        matrix[positions] = decode_matrix(
+            [rows[i][1] for i in positions],
+            dim,
+            VectorDType(dtype),
+            [rows[i][4] for i in positions],
+        )
+    return matrix, ids
+
+
+def load_document_matrix(
+    db: Session, document_id: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """문서 한 건의 청크 임베딩을 (행렬, 청크 id) 로 로드"""
+    stmt = (
+        select(*_EMBEDDING_COLUMNS)
+        .where(DocumentChunk.document_id == document_id)
+        .where(DocumentChunk.embedding.is_not(None))
+        .order_by(DocumentChunk.chunk_index)
+    )
+    return _rows_to_matrix(list(db.execute(stmt).tuples()))
+
+
+def load_chunk_matrix(
+    db: Session, chunk_ids: Iterable[int], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """지정한 청크들의 임베딩을 (행렬, 청크 id) 로 로드 (id 순)"""
+    rows: List[tuple] = []
+    ids = sorted(int(chunk_id) for chunk_id in chunk_ids)
+    for start in range(0, len(ids), batch_size):
+        stmt = (
+            select(*_EMBEDDING_COLUMNS)
+            .where(DocumentChunk.id.in_(ids[start : start + batch_size]))
+            .where(DocumentChunk.embedding.is_not(None))
+            .order_by(DocumentChunk.id)
+        )
+        rows.extend(db.execute(stmt).tuples())
+    return _rows_to_matrix(rows)
+
+
+def load_shard_matrix(
+    db: Session,
+    start_id: int,
+    end_id: int,
+    document_ids: Optional[Iterable[int]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """청크 id 구간 [start_id, end_id) 의 임베딩을 (행렬, 청크 id) 로 로드"""
+    stmt = (
+        select(*_EMBEDDING_COLUMNS)
+        .where(DocumentChunk.id >= start_id)
+        .where(DocumentChunk.id < end_id)
+        .where(DocumentChunk.embedding.is_not(None))
+        .order_by(DocumentChunk.id)
+    )
+    if document_ids is not None:
+        stmt = stmt.where(DocumentChunk.document_id.in_(list(document_ids)))
+    return _rows_to_matrix(list(db.execute(stmt).tuples()))
+
+
+def store_embeddings(
+    db: Session,
+    chunk_ids: Iterable[int],
+    matrix: np.ndarray,
+    dtype: VectorDType = VectorDType.FLOAT32,
+) -> int:
+    """청크 id 순서에 맞춰 임베딩 행렬을 일괄 저장 (커밋은 호출자 책임)"""
+    ids = [int(chunk_id) for chunk_id in chunk_ids]
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    if len(ids) != len(matrix):
+        raise ValueError("청크 id 개수와 임베딩 행 수가 다릅니다")
+    if not ids:
+        return 0
+    blobs, scales = encode_matrix(matrix, dtype)
+    dtype_value = VectorDType(dtype).value
+    db.execute(
+        update(DocumentChunk),
+        [
+            {
+                "id": chunk_id,
+                "embedding": blob,
+                "embedding_dim": matrix.shape[1],
+                "embedding_dtype": dtype_value,
+                "embedding_scale": scale,
+                "embedding_vector": None,
+            }
+            for chunk_id, blob, scale in zip(ids, blobs, scales)
+        ],
+    )
+    return len(ids)
+
+
+def migrate_json_embeddings(
+    db: Session,
+    dtype: VectorDType = VectorDType.FLOAT32,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """레거시 JSON 임베딩을 바이너리 컬럼으로 배치 변환
+
+    배치마다 커밋하므로 중간에 중단돼도 다시 실행하면 남은 행부터 이어서
+    변환한다. 수집 워커가 시작할 때 호출하며 변환된 행 수를 반환한다.
+    """
+    converted = 0
+    last_id = 0
+    while True:
+        stmt = (
+            select(DocumentChunk.id, DocumentChunk.embedding_vector)
+            .where(DocumentChunk.id > last_id)
+            .where(DocumentChunk.embedding_vector.is_not(None))
+            .where(DocumentChunk.embedding.is_(None))
+            .order_by(DocumentChunk.id)
+            .limit(batch_size)
+        )
+        rows = [(chunk_id, str(text)) for chunk_id, text in db.execute(stmt)]
+        if not rows:
+            return converted
+        vectors = [parse_json_vector(text) for _, text in rows]
+        dims = {len(vector) for vector in vectors}
+        if len(dims) != 1:
+            raise ValueError(f"임베딩 차원이 섞여 있습니다: {sorted(dims)}")
+        store_embeddings(db, [row[0] for row in rows], np.vstack(vectors), dtype)
+        db.commit()
+        converted += len(rows)
+        last_id = rows[-1][0]
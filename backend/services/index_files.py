@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import time
+from typing import Callable, Tuple, TypeVar
+
+MANIFEST = "manifest.json"
+# 교체된 세대 디렉터리를 지우기 전까지 남겨 두는 시간 (초). 그 사이에 로드를
+# 시작한 다른 프로세스가 파일을 잃지 않도록 한다
+GENERATION_GRACE = 300.0
+_LOAD_ATTEMPTS = 5
+
+T = TypeVar("T")
+
+
+def read_manifest(path: str) -> dict:
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    tmp_path = os.path.join(path, MANIFEST + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(path, MANIFEST))
+
+
+def manifest_mtime(path: str) -> int:
+    return os.stat(os.path.join(path, MANIFEST)).st_mtime_ns
+
+
+def publish_generation(path: str, generation: int, directory: str) -> None:
+    """매니페스트를 새 세대로 바꾸고 유예 시간이 지난 이전 세대를 삭제"""
+    previous = read_manifest(path)
+    now = time.time()
+    retired = list(previous.get("retired", []))
+    if previous.get("directory") not in (None, directory):
+        retired.append([previous["directory"], now])
+    expired = [name for name, at in retired if now - at >= GENERATION_GRACE]
+    write_manifest(
+        path,
+        {
+            "generation": generation,
+            "directory": directory,
+            "retired": [entry for entry in retired if entry[0] not in expired],
+        },
+    )
+    for name in expired:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def load_consistent(path: str, load: Callable[[dict], T]) -> Tuple[T, int]:
+    """매니페스트가 가리키는 세대를 읽고 (상태, 매니페스트 mtime) 반환
+
+    읽는 도중 작성자가 매니페스트를 바꾸면 다시 읽는다. 끝내 바뀌더라도 읽기
+    전의 mtime 을 돌려주므로 다음 ``reload_if_stale`` 이 다시 로드한다.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        mtime = manifest_mtime(path)
+        manifest = read_manifest(path)
+        try:
+            state = load(manifest)
+        except FileNotFoundError:
+            # 유예 시간보다 오래 걸린 로드 중에 세대가 지워진 경우
+            if attempt >= _LOAD_ATTEMPTS:
+                raise
+            continue
+        if attempt >= _LOAD_ATTEMPTS or manifest_mtime(path) == mtime:
+            return state, mtime
@@ -0,0 +1,547 @@
+import codecs
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from core.metrics import INGEST_CHUNKS, stage_timer
+from core.vectors import VectorDType, encode_matrix
+from models.document import Document, DocumentChunk  # type: ignore
+from services.embedding import embed_texts_sync
+from services.embedding_store import load_chunk_matrix
+from services.lexical_index import LexicalIndex, ensure_lexical_index
+from services.progress import ProgressTracker, progress_tracker
+from services.query_cache import document_set_versions
+from services.vector_store import VectorStore, ensure_vector_index
+
+logger = logging.getLogger(__name__)
+
+TEXT_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass
+class PageText:
+    """파서가 내보내는 텍스트 조각"""
+
+    page_number: Optional[int]
+    text: str
+    fraction: float  # 파일 기준 처리 비율 (0~1)
+
+
+@dataclass
+class TextChunk:
+    """청킹 결과"""
+
+    chunk_index: int
+    content: str
+    page_number: Optional[int]
+
+
+@contextmanager
+def local_copy(location: str) -> Iterator[str]:
+    """S3 객체는 임시 파일로 스트리밍 다운로드하여 로컬 경로로 제공"""
+    if not location.startswith("s3://"):
+        yield location
+        return
+    from services.upload import s3_client
+
+    bucket, key = location[len("s3://") :].split("/", 1)
+    suffix = os.path.splitext(key)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        tmp_path = f.name
+        s3_client().download_fileobj(bucket, key, f)
+    try:
+        yield tmp_path
+    finally:
+        os.remove(tmp_path)
+
+
+def _iter_txt(path: str) -> Iterator[PageText]:
+    total = max(os.path.getsize(path), 1)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    read = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(TEXT_BLOCK_SIZE)
+            read += len(block)
+            text = decoder.decode(block, final=not block)
+            if text:
+                yield PageText(None, text, read / total)
+            if not block:
+                return
+
+
+def _iter_pdf(path: str) -> Iterator[PageText]:
+    from PyPDF2 import PdfReader  # type: ignore
+
+    reader = PdfReader(path)
+    total = max(len(reader.pages), 1)
+    for number, page in enumerate(reader.pages, start=1):
+        yield PageText(number, page.extract_text() or "", number / total)
+
+
+def _iter_docx(path: str) -> Iterator[PageText]:
+    import docx  # type: ignore
+
+    paragraphs = docx.Document(path).paragraphs
+    total = max(len(paragraphs), 1)
+    block: List[str] = []
+    size = 0
+    for number, paragraph in enumerate(paragraphs, start=1):
+        block.append(paragraph.text)
+        size += len(paragraph.text)
+        if size >= TEXT_BLOCK_SIZE:
+            yield PageText(None, "\n".join(block) + "\n", number / total)
+            block, size = [], 0
+    if block:
+        yield PageText(None, "\n".join(block), 1.0)
+
+
+_PARSERS = {"txt": _iter_txt, "pdf": _iter_pdf, "docx": _iter_docx}
+
+
+def iter_pages(path: str, file_type: str) -> Iterator[PageText]:
+    """파일 형식별 텍스트를 조각 단위로 생성"""
+    parser = _PARSERS.get(file_type.lstrip(".").lower())
+    if parser is None:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {file_type}")
+    return parser(path)
+
+
+# 청크 경계: 직전 ANCHOR_WINDOW 단어의 해시가 ANCHOR_MODULUS 로 나누어떨어지는 곳
+ANCHOR_WINDOW = 3
+ANCHOR_MODULUS = 32
+_WORD = re.compile(r"[^\s.!?。！？]+[\s.!?。！？]*|[\s.!?。！？]+")
+
+
+def chunk_hash(content: str) -> str:
+    """청크 본문의 SHA-256 (증분 재처리 비교용)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class _BoundaryScanner:
+    """내용 기반 청크 경계 탐색
+
+    경계는 앞 청크의 끝 위치가 아니라 주변 단어만으로 정해지므로, 문서
+    일부를 고쳐도 수정 위치 근처의 청크만 바뀌고 나머지 경계는 그대로다.
+    본문 길이는 [min_size, max_size] 로 제한한다.
+    """
+
+    def __init__(self, min_size: int, max_size: int):
+        self.min_size = min_size
+        self.max_size = max_size
+        self._words: List[str] = []
+        self._size = 0
+        self._window: Deque[str] = deque(maxlen=ANCHOR_WINDOW)
+        self._carry = ""
+
+    def feed(self, text: str, final: bool = False) -> Iterator[str]:
+        """텍스트를 이어 받아 완성된 청크 본문을 생성"""
+        text = self._carry + text
+        self._carry = ""
+        words = [match.group() for match in _WORD.finditer(text)]
+        # 조각 끝의 단어는 다음 조각에서 이어질 수 있으므로 합쳐서 본다
+        if not final and words and len(words[-1]) < self.max_size:
+            self._carry = words.pop()
+        for word in words:
+            if self._words and self._size + len(word) > self.max_size:
+                yield self._cut()
+            while len(word) > self.max_size:
+                yield word[: self.max_size]
+                word = word[self.max_size :]
+            self._words.append(word)
+            self._size += len(word)
+            self._window.append(word.strip())
+            if self._size >= self.min_size and self._is_anchor():
+                yield self._cut()
+        if final and self._words:
+            yield self._cut()
+
+    def _is_anchor(self) -> bool:
+        key = "\x00".join(self._window).encode("utf-8")
+        return zlib.crc32(key) % ANCHOR_MODULUS == 0
+
+    def _cut(self) -> str:
+        body = "".join(self._words)
+        self._words = []
+        self._size = 0
+        return body
+
+
+def _overlap_tail(body: str, overlap: int) -> str:
+    """다음 청크 앞에 붙일 본문 끝부분 (단어 경계에서 시작)"""
+    if overlap <= 0 or len(body) <= overlap:
+        return body if overlap > 0 else ""
+    tail = body[-overlap:]
+    space = re.search(r"\s", tail)
+    return tail[space.end() :] if space else tail
+
+
+def iter_chunks(
+    pages: Iterable[PageText],
+    chunk_size: int = settings.CHUNK_SIZE,
+    overlap: int = settings.CHUNK_OVERLAP,
+) -> Iterator[TextChunk]:
+    """텍스트 조각을 겹침이 있는 청크로 변환
+
+    청크 경계는 내용 기반(``_BoundaryScanner``)으로 정해 같은 본문은 항상
+    같은 청크가 된다. 각 청크는 앞 청크 끝의 최대 ``overlap`` 글자를
+    이어 붙여 ``chunk_size`` 를 넘지 않는다. 청크는 페이지 경계를 넘지
+    않으며, 버퍼에는 청크 하나와 현재 조각만 유지된다.
+    """
+    if not 0 <= overlap < chunk_size // 2:
+        raise ValueError("overlap 은 chunk_size 의 절반보다 작아야 합니다")
+    max_size = chunk_size - overlap
+    index = 0
+    page_number: Optional[int] = None
+    scanner: Optional[_BoundaryScanner] = None
+    tail = ""
+
+    def emit(bodies: Iterable[str]) -> Iterator[TextChunk]:
+        nonlocal index, tail
+        for body in bodies:
+            content = (tail + body).strip()
+            tail = _overlap_tail(body, overlap)
+            if content:
+                yield TextChunk(index, content, page_number)
+                index += 1
+
+    for page in pages:
+        if scanner is None or page.page_number != page_number:
+            if scanner is not None:
+                yield from emit(scanner.feed("", final=True))
+            scanner = _BoundaryScanner(max_size // 2, max_size)
+            page_number = page.page_number
+            tail = ""
+        yield from emit(scanner.feed(page.text))
+    if scanner is not None:
+        yield from emit(scanner.feed("", final=True))
+
+
+@dataclass
+class IngestionReport:
+    """청크 저장 결과 (기존 청크 재사용으로 절약한 작업량 포함)"""
+
+    document_id: int
+    content_hash: Optional[str]  # 처리한 파일의 SHA-256
+    total_chunks: int = 0
+    reused_chunks: int = 0  # 기존 행·임베딩을 그대로 쓴 청크
+    embedded_chunks: int = 0  # 새로 임베딩해 저장한 청크
+    removed_chunks: int = 0  # 새 버전에 없어 삭제한 청크
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_chunks / self.total_chunks if self.total_chunks else 0.0
+
+
+def _existing_chunks(
+    db: Session, document_id: int, batch_size: int = settings.INGEST_BATCH_SIZE
+) -> Dict[str, Deque]:
+    """문서의 기존 청크를 본문 해시별로 (chunk_index 순) 모음
+
+    해시가 없는 이전 행은 batch_size 개씩 본문을 읽어 계산해 채워 둔다.
+    """
+    rows = db.execute(
+        select(
+            DocumentChunk.id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.page_number,
+            DocumentChunk.content_hash,
+        )
+        .where(DocumentChunk.document_id == document_id)
+        .order_by(DocumentChunk.chunk_index, DocumentChunk.id)
+    ).all()
+    missing = [row.id for row in rows if row.content_hash is None]
+    hashes: Dict[int, str] = {}
+    for start in range(0, len(missing), batch_size):
+        batch = {
+            chunk_id: chunk_hash(content)
+            for chunk_id, content in db.execute(
+                select(DocumentChunk.id, DocumentChunk.content).where(
+                    DocumentChunk.id.in_(missing[start : start + batch_size])
+                )
+            )
+        }
+        db.execute(
+            update(DocumentChunk),
+            [{"id": i, "content_hash": h} for i, h in batch.items()],
+        )
+        db.commit()
+        hashes.update(batch)
+
+    existing: Dict[str, Deque] = {}
+    for row in rows:
+        key = row.content_hash or hashes[row.id]
+        existing.setdefault(key, deque()).append(row)
+    return existing
+
+
+@stage_timer("ingestion")
+def write_chunks(
+    db: Session,
+    document: Document,
+    progress: ProgressTracker = progress_tracker,
+    batch_size: int = settings.INGEST_BATCH_SIZE,
+) -> IngestionReport:
+    """문서를 파싱·청킹해 기존 청크와 비교하고 바뀐 청크만 임베딩·저장
+
+    본문 해시가 같은 기존 행은 임베딩째 재사용하고 순서와 페이지 번호만
+    고친다. 새 청크는 batch_size 단위로 임베딩 후 insert·커밋하므로 ORM
+    객체나 전체 임베딩 행렬이 메모리에 쌓이지 않는다. 새 버전에 없는 행은
+    마지막에 지운다. 중간에 죽은 작업을 다시 실행해도 이전 시도에서 저장한
+    청크는 해시로 재사용되어 다시 임베딩하지 않는다. 검색 색인 반영은
+    ``finalize_document`` 가 맡는다.
+    """
+    existing = _existing_chunks(db, document.id, batch_size)
+    report = IngestionReport(document.id, document.content_hash)
+    fraction = 0.0
+
+    def tracked(pages: Iterable[PageText]) -> Iterator[PageText]:
+        nonlocal fraction
+        for page in pages:
+            fraction = page.fraction
+            yield page
+
+    def write_batch() -> None:
+        report.embedded_chunks += _insert_chunks(db, inserts)
+        _move_chunks(db, moves)
+        progress.update(
+            document.id, fraction=fraction, processed_chunks=report.total_chunks
+        )
+
+    progress.update(document.id, stage="parsing", fraction=0.0, processed_chunks=0)
+    inserts: List[Dict] = []
+    moves: List[Dict] = []
+    with local_copy(document.file_path) as path:
+        for chunk in iter_chunks(tracked(iter_pages(path, document.file_type))):
+            report.total_chunks += 1
+            content_hash = chunk_hash(chunk.content)
+            reusable = existing.get(content_hash)
+            if reusable:
+                row = reusable.popleft()
+                report.reused_chunks += 1
+                if (row.chunk_index, row.page_number) != (
+                    chunk.chunk_index,
+                    chunk.page_number,
+                ):
+                    moves.append(
+                        {
+                            "id": row.id,
+                            "chunk_index": chunk.chunk_index,
+                            "page_number": chunk.page_number,
+                        }
+                    )
+            else:
+                inserts.append(
+                    {
+                        "document_id": document.id,
+                        "chunk_index": chunk.chunk_index,
+                        "content": chunk.content,
+                        "content_hash": content_hash,
+                        "page_number": chunk.page_number,
+                    }
+                )
+            if len(inserts) >= batch_size or len(moves) >= batch_size:
+                write_batch()
+    write_batch()
+
+    stale = [row.id for rows in existing.values() for row in rows]
+    for start in range(0, len(stale), batch_size):
+        db.execute(
+            delete(DocumentChunk).where(
+                DocumentChunk.id.in_(stale[start : start + batch_size])
+            )
+        )
+    db.commit()
+    report.removed_chunks = len(stale)
+
+    for result in ("reused", "embedded", "removed"):
+        INGEST_CHUNKS.labels(result).inc(getattr(report, f"{result}_chunks"))
+    progress.update(
+        document.id,
+        reused_chunks=report.reused_chunks,
+        embedded_chunks=report.embedded_chunks,
+    )
+    logger.info(
+        "청크 저장: document_id=%s 전체 %d, 재사용 %d (%.0f%%), 임베딩 %d, 삭제 %d",
+        document.id,
+        report.total_chunks,
+        report.reused_chunks,
+        report.reuse_ratio * 100,
+        report.embedded_chunks,
+        report.removed_chunks,
+    )
+    return report
+
+
+@stage_timer("indexing")
+def finalize_document(
+    db: Session,
+    document: Document,
+    progress: ProgressTracker = progress_tracker,
+    batch_size: int = settings.INGEST_BATCH_SIZE,
+) -> None:
+    """색인을 DB 청크와 맞추고 처리 완료로 표시
+
+    색인에 남은 청크 중 DB 에 없는 것만 지우고, DB 에 있지만 색인에 없는
+    청크만 추가한다. 재사용된 청크의 색인 항목은 그대로 둔다. 색인 쓰기는
+    한 프로세스에서만 하도록 수집 워커의 부모 프로세스에서 호출한다.
+    """
+    progress.update(document.id, stage="indexing", fraction=1.0)
+    chunk_ids = np.asarray(
+        db.scalars(
+            select(DocumentChunk.id).where(DocumentChunk.document_id == document.id)
+        ).all(),
+        dtype=np.int64,
+    )
+    store = _vector_store(db)
+    if store is not None:
+        _sync_vectors(db, document, store, chunk_ids, batch_size)
+    lexical = ensure_lexical_index(db)
+    _sync_lexical(db, document, lexical, chunk_ids, batch_size)
+
+    document.is_processed = True
+    db.commit()
+    if store is not None:
+        store.flush()
+    lexical.flush()
+    document_set_versions.bump(document.user_id)
+    progress.update(
+        document.id, stage="completed", fraction=1.0, processed_chunks=len(chunk_ids)
+    )
+
+
+def _sync_vectors(
+    db: Session,
+    document: Document,
+    store: VectorStore,
+    chunk_ids: np.ndarray,
+    batch_size: int,
+) -> None:
+    indexed = store.document_chunk_ids(document.id)
+    stale = np.setdiff1d(indexed, chunk_ids)
+    if len(stale):
+        store.delete_chunks(stale.tolist())
+    missing = np.setdiff1d(chunk_ids, indexed)
+    for start in range(0, len(missing), batch_size):
+        matrix, vector_ids = load_chunk_matrix(db, missing[start : start + batch_size])
+        if len(vector_ids):
+            store.add(
+                vector_ids,
+                np.full(len(vector_ids), document.id),
+                np.full(len(vector_ids), document.user_id),
+                matrix,
+            )
+
+
+def _sync_lexical(
+    db: Session,
+    document: Document,
+    lexical: LexicalIndex,
+    chunk_ids: np.ndarray,
+    batch_size: int,
+) -> None:
+    indexed = lexical.document_chunk_ids(document.id)
+    stale = np.setdiff1d(indexed, chunk_ids)
+    if len(stale):
+        lexical.delete_chunks(stale.tolist())
+    missing = np.setdiff1d(chunk_ids, indexed).tolist()
+    for start in range(0, len(missing), batch_size):
+        rows = db.execute(
+            select(DocumentChunk.id, DocumentChunk.content).where(
+                DocumentChunk.id.in_(missing[start : start + batch_size])
+            )
+        ).all()
+        lexical.add(
+            [row.id for row in rows],
+            np.full(len(rows), document.id),
+            np.full(len(rows), document.user_id),
+            [row.content for row in rows],
+        )
+
+
+def remove_deleted_document(db: Session, document_id: int) -> None:
+    """삭제된 문서의 벡터·역색인 항목을 제거 (색인 작성자 프로세스에서 호출)"""
+    store = _vector_store(db)
+    if store is not None and len(store.document_chunk_ids(document_id)):
+        store.delete_documents([document_id])
+        store.flush()
+    lexical = ensure_lexical_index(db)
+    if len(lexical.document_chunk_ids(document_id)):
+        lexical.delete_documents([document_id])
+        lexical.flush()
+
+
+def release_stale_files(db: Session, document_id: int) -> None:
+    """교체되기 전 파일을 삭제 (그 파일을 읽던 작업이 끝난 뒤 워커에서 호출)
+
+    삭제하는 사이에 API 가 목록에 새 파일을 더했으면 목록은 그대로 두고
+    다음 작업이 끝날 때 다시 정리한다.
+    """
+    raw = db.scalar(select(Document.stale_file_paths).where(Document.id == document_id))
+    if not raw:
+        return
+    from services.upload import delete_stored_file_sync
+
+    for location in json.loads(raw):
+        try:
+            delete_stored_file_sync(location)
+        except Exception as e:
+            logger.warning("이전 파일 삭제 실패: %s (%s)", location, e)
+    db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .where(Document.stale_file_paths == raw)
+        .values(stale_file_paths=None)
+    )
+    db.commit()
+
+
+def _vector_store(db: Session) -> Optional[VectorStore]:
+    """인프로세스 벡터 저장소 (외부 벡터 DB 사용 시 None)"""
+    try:
+        return ensure_vector_index(db)
+    except NotImplementedError:
+        return None
+
+
+def _move_chunks(db: Session, rows: List[Dict]) -> None:
+    """재사용하는 청크의 순서·페이지 번호를 갱신 후 커밋하고 버퍼를 비움"""
+    if not rows:
+        return
+    db.execute(update(DocumentChunk), rows)
+    db.commit()
+    rows.clear()
+
+
+def _insert_chunks(db: Session, rows: List[Dict]) -> int:
+    """청크 행을 임베딩·bulk insert 후 커밋하고 버퍼를 비움"""
+    if not rows:
+        return 0
+    vectors = embed_texts_sync([row["content"] for row in rows])
+    dtype = VectorDType(settings.EMBEDDING_STORAGE_DTYPE)
+    blobs, scales = encode_matrix(vectors, dtype)
+    for row, blob, scale in zip(rows, blobs, scales):
+        row.update(
+            embedding=blob,
+            embedding_dim=vectors.shape[1],
+            embedding_dtype=dtype.value,
+            embedding_scale=scale,
+        )
+    db.execute(insert(DocumentChunk), rows)
+    db.commit()
+    count = len(rows)
+    rows.clear()
+    return count
@@ -0,0 +1,361 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, List, Optional
+
+from prometheus_client import start_http_server
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from core.metrics import mark_processes_dead, metrics_registry
+from core.vectors import VectorDType
+from models.document import Document  # type: ignore
+
+# 워커 프로세스에서도 Document.user 관계 매퍼가 구성되도록 함께 로드
+from models.user import User  # noqa: F401  # type: ignore
+from services.embedding_store import migrate_json_embeddings
+from services.ingestion import (
+    IngestionReport,
+    finalize_document,
+    release_stale_files,
+    remove_deleted_document,
+    write_chunks,
+)
+from services.job_queue import IngestionJob, JobQueue, get_job_queue
+from services.lexical_index import ensure_lexical_index
+from services.progress import IngestionProgress, ProgressTracker, progress_tracker
+from services.vector_store import ensure_vector_index
+
+logger = logging.getLogger(__name__)
+
+# 청크 저장 단계가 진행 상태를 기록할 곳 (워커 프로세스에서는 부모로 전달)
+_progress: ProgressTracker = progress_tracker
+
+
+class _ForwardingProgress(ProgressTracker):
+    """워커 프로세스의 진행 상태 갱신을 부모 프로세스로 전달"""
+
+    def __init__(self, events) -> None:
+        super().__init__()
+        self._events = events
+
+    def update(self, document_id: int, **changes) -> IngestionProgress:
+        self._events.put((document_id, changes))
+        return IngestionProgress(document_id, **changes)
+
+
+def _pool_pids(pool: Optional[Executor]) -> List[int]:
+    """프로세스 풀의 자식 pid (종료 전에 읽어야 한다)"""
+    processes = getattr(pool, "_processes", None) or {}
+    return list(processes)
+
+
+def _init_process(events) -> None:
+    global _progress
+    _progress = _ForwardingProgress(events)
+
+
+def run_ingestion_job(document_id: int) -> Optional[IngestionReport]:
+    """문서를 파싱·임베딩해 청크를 저장 (워커 프로세스에서 실행)
+
+    이미 처리됐거나 지워진 문서면 None 을 반환한다. 이미 저장된 청크는
+    본문 해시로 재사용하므로 재시도해도 안전하다.
+    """
+    with SessionLocal() as db:
+        document = db.get(Document, document_id)
+        if document is None or document.is_processed:
+            return None
+        return write_chunks(db, document, _progress)
+
+
+class IngestionWorker:
+    """작업 큐에서 문서를 꺼내 처리하는 워커 풀
+
+    파싱·임베딩·청크 저장은 프로세스 풀에서 최대 ``concurrency`` 개까지
+    동시에 실행하고, 남은 작업은 큐에 그대로 둔다. 벡터·역색인 쓰기는
+    단일 작성자 가정을 지키도록 이 프로세스의 전용 스레드 하나에서 한다.
+    실패한 작업은 지수 백오프로 ``max_attempts`` 번까지 다시 시도한다.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        concurrency: int = settings.INGEST_CONCURRENCY,
+        mode: str = settings.INGEST_WORKER_MODE,
+        max_attempts: int = settings.INGEST_MAX_ATTEMPTS,
+        retry_backoff: float = settings.INGEST_RETRY_BACKOFF,
+        progress: ProgressTracker = progress_tracker,
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"지원하지 않는 워커 모드: {mode}")
+        self._queue = queue
+        self.concurrency = concurrency
+        self.mode = mode
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.progress = progress
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._indexer: Optional[ThreadPoolExecutor] = None
+        self._events: Optional[Any] = None
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._stop = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pump: Optional[threading.Thread] = None
+
+    @property
+    def queue(self) -> JobQueue:
+        if self._queue is None:
+            self._queue = get_job_queue()
+        return self._queue
+
+    def start(self) -> None:
+        if self._dispatcher is not None and self._dispatcher.is_alive():
+            return
+        self._stop.clear()
+        self.queue.recover()
+        self._ensure_indexes()
+        self._enqueue_unprocessed()
+
+        if self.mode == "process":
+            self._events = multiprocessing.get_context("spawn").Queue()
+            self._pump = threading.Thread(
+                target=self._pump_progress,
+                args=(self._events,),
+                name="ingest-progress",
+                daemon=True,
+            )
+            self._pump.start()
+        self._pool = self._new_pool()
+        self._indexer = ThreadPoolExecutor(1, thread_name_prefix="ingest-index")
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="ingest-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        """새 작업을 멈추고 실행 중인 작업이 끝나길 기다림
+
+        시작하지 않은 작업은 큐(또는 Redis 의 실행 중 리스트)에 남아 다음
+        시작 때 다시 처리된다.
+        """
+        self._stop.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._pool is not None:
+            pids = _pool_pids(self._pool)
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            mark_processes_dead(pids)
+            self._pool = None
+        if self._indexer is not None:
+            self._indexer.shutdown(wait=True)
+            self._indexer = None
+        if self._events is not None:
+            self._events.put(None)
+            if self._pump is not None:
+                self._pump.join()
+                self._pump = None
+            self._events = None
+
+    def _new_pool(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(
+                self.concurrency, thread_name_prefix="ingest-worker"
+            )
+        return ProcessPoolExecutor(
+            self.concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process,
+            initargs=(self._events,),
+        )
+
+    def _replace_broken_pool(self, broken: Executor) -> None:
+        """워커 프로세스가 비정상 종료되면 풀을 새로 만듦"""
+        with self._pool_lock:
+            if self._pool is broken and not self._stop.is_set():
+                logger.warning("문서 처리 프로세스 풀이 중단되어 다시 생성합니다.")
+                pids = _pool_pids(broken)
+                broken.shutdown(wait=False)
+                mark_processes_dead(pids)
+                self._pool = self._new_pool()
+
+    def _ensure_indexes(self) -> None:
+        """레거시 JSON 임베딩을 변환하고 색인이 없으면 DB 로 빌드
+
+        색인 작성자는 이 프로세스뿐이다.
+        """
+        with SessionLocal() as db:
+            converted = migrate_json_embeddings(
+                db, VectorDType(settings.EMBEDDING_STORAGE_DTYPE)
+            )
+            if converted:
+                logger.info("JSON 임베딩 %d건을 바이너리로 변환함", converted)
+            try:
+                ensure_vector_index(db)
+            except NotImplementedError:
+                pass
+            ensure_lexical_index(db)
+
+    def _enqueue_unprocessed(self) -> None:
+        """처리되지 않은 문서를 큐에 넣음 (큐가 비어 있던 재시작 대비)"""
+        with SessionLocal() as db:
+            document_ids = db.scalars(
+                select(Document.id).where(Document.is_processed.is_(False))
+            ).all()
+        queued = sum(self.queue.enqueue(document_id) for document_id in document_ids)
+        if queued:
+            logger.info("처리되지 않은 문서 %d건을 대기열에 넣음", queued)
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            # 실행 슬롯이 없으면 큐에서 꺼내지 않아 작업이 큐에 남는다
+            if not self._slots.acquire(timeout=0.5):
+                continue
+            try:
+                job = self.queue.dequeue(timeout=1.0)
+            except Exception:
+                logger.exception("작업 큐 조회 실패")
+                self._slots.release()
+                self._stop.wait(1.0)
+                continue
+            if job is None:
+                self._slots.release()
+                continue
+            self._submit(job)
+
+    def _submit(self, job: IngestionJob) -> None:
+        pool, indexer = self._pool, self._indexer
+        assert pool is not None and indexer is not None, "워커가 시작되지 않음"
+        try:
+            future = pool.submit(run_ingestion_job, job.document_id)
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            pool = self._pool
+            assert pool is not None
+            future = pool.submit(run_ingestion_job, job.document_id)
+        submitted = pool
+        future.add_done_callback(
+            lambda done: indexer.submit(self._complete, job, done, submitted)
+        )
+
+    def _complete(self, job: IngestionJob, future: Future, pool: Executor) -> None:
+        """청크 저장이 끝난 작업을 색인하고 완료/재시도 처리"""
+        try:
+            if future.cancelled():
+                return
+            try:
+                report = future.result()
+            except BrokenProcessPool:
+                self._replace_broken_pool(pool)
+                raise
+            with SessionLocal() as db:
+                document = db.get(Document, job.document_id)
+                if document is None:
+                    remove_deleted_document(db, job.document_id)
+                # 처리 중 새 버전으로 교체됐으면 색인하지 않고 다시 처리한다
+                elif (
+                    report is not None
+                    and not document.is_processed
+                    and document.content_hash == report.content_hash
+                ):
+                    finalize_document(db, document, self.progress)
+                # 같은 문서의 작업은 한 번에 하나뿐이라 이전 파일을 읽는 곳이 없다
+                if document is not None:
+                    release_stale_files(db, job.document_id)
+            self.queue.ack(job)
+            self._requeue_if_unprocessed(job.document_id)
+        except Exception as e:
+            self._fail(job, e)
+        finally:
+            self._slots.release()
+
+    def _requeue_if_unprocessed(self, document_id: int) -> None:
+        """완료 처리 전후로 교체된 문서는 중복 방지에 막혔을 수 있어 다시 넣음"""
+        with SessionLocal() as db:
+            processed = db.scalar(
+                select(Document.is_processed).where(Document.id == document_id)
+            )
+        if processed is False:
+            self.queue.enqueue(document_id)
+
+    def _fail(self, job: IngestionJob, error: Exception) -> None:
+        attempts = job.attempts + 1
+        try:
+            if attempts >= self.max_attempts:
+                logger.error(
+                    "문서 처리 실패: document_id=%s (%d회 시도)",
+                    job.document_id,
+                    attempts,
+                    exc_info=error,
+                )
+                with SessionLocal() as db:
+                    release_stale_files(db, job.document_id)
+                self.queue.ack(job)
+                self.progress.update(
+                    job.document_id, stage="failed", attempts=attempts, error=str(error)
+                )
+                return
+            delay = self.retry_backoff * 2**job.attempts
+            logger.warning(
+                "문서 처리 재시도 예정: document_id=%s (%d회 실패, %.1f초 후): %s",
+                job.document_id,
+                attempts,
+                delay,
+                error,
+            )
+            self.queue.retry(job, delay)
+            self.progress.update(
+                job.document_id, stage="queued", attempts=attempts, error=str(error)
+            )
+        except Exception:
+            logger.exception("작업 상태 갱신 실패: document_id=%s", job.document_id)
+
+    def _pump_progress(self, events) -> None:
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            document_id, changes = event
+            self.progress.update(document_id, **changes)
+
+
+ingestion_worker = IngestionWorker()
+
+
+def _serve_metrics(mode: str) -> None:
+    """워커 프로세스의 /metrics 를 INGEST_METRICS_PORT 로 노출
+
+    API 서버의 /metrics 와는 프로세스가 달라 청크 수·단계별 처리 시간이
+    보이지 않으므로 워커를 따로 수집한다. process 모드의 자식 프로세스 값은
+    PROMETHEUS_MULTIPROC_DIR 로 합산한다.
+    """
+    if not settings.INGEST_METRICS_PORT:
+        return
+    if mode == "process" and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR 이 없어 문서 처리 프로세스의 메트릭은 "
+            "수집되지 않습니다."
+        )
+    start_http_server(settings.INGEST_METRICS_PORT, registry=metrics_registry())
+
+
+def main() -> None:
+    """API 서버와 분리해 워커만 실행 (INGEST_WORKER_ENABLED=false 인 서버와 함께)"""
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopped.set())
+    _serve_metrics(ingestion_worker.mode)
+    ingestion_worker.start()
+    stopped.wait()
+    ingestion_worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import heapq
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, List, Optional, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionJob:
+    """문서 처리 작업 (문서 id 로 식별되며 여러 번 실행해도 결과가 같다)"""
+
+    document_id: int
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def loads(cls, raw) -> "IngestionJob":
+        return cls(**json.loads(raw))
+
+
+class JobQueue(ABC):
+    """문서 처리 작업 큐 인터페이스
+
+    같은 문서의 작업은 대기·실행·재시도 대기 중 하나에만 존재한다.
+    """
+
+    @abstractmethod
+    def enqueue(self, document_id: int) -> bool:
+        """작업 추가 (이미 대기 중이면 False)"""
+
+    @abstractmethod
+    def dequeue(self, timeout: float) -> Optional[IngestionJob]:
+        """작업을 꺼내 실행 중으로 표시 (timeout 초 동안 없으면 None)"""
+
+    @abstractmethod
+    def ack(self, job: IngestionJob) -> None:
+        """작업 완료 (또는 최종 실패) 처리"""
+
+    @abstractmethod
+    def retry(self, job: IngestionJob, delay: float) -> None:
+        """delay 초 뒤에 다시 실행되도록 시도 횟수를 올려 되돌림"""
+
+    @abstractmethod
+    def depth(self) -> int:
+        """실행을 기다리는 작업 수 (재시도 대기 포함)"""
+
+    def recover(self) -> int:
+        """이전 워커가 실행 중에 종료된 작업을 대기열로 되돌림"""
+        return 0
+
+
+class InMemoryJobQueue(JobQueue):
+    """프로세스 내 작업 큐 (Redis 가 없는 개발·테스트 환경용)"""
+
+    def __init__(self) -> None:
+        self._ready: Deque[IngestionJob] = deque()
+        self._delayed: List[Tuple[float, int, IngestionJob]] = []
+        self._pending: Set[int] = set()
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    def enqueue(self, document_id: int) -> bool:
+        with self._condition:
+            if document_id in self._pending:
+                return False
+            self._pending.add(document_id)
+            self._ready.append(IngestionJob(document_id))
+            self._condition.notify()
+            return True
+
+    def dequeue(self, timeout: float) -> Optional[IngestionJob]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    return self._ready.popleft()
+                wait = deadline - now
+                if self._delayed:
+                    wait = min(wait, self._delayed[0][0] - now)
+                if deadline <= now:
+                    return None
+                self._condition.wait(wait)
+
+    def ack(self, job: IngestionJob) -> None:
+        with self._condition:
+            self._pending.discard(job.document_id)
+
+    def retry(self, job: IngestionJob, delay: float) -> None:
+        with self._condition:
+            self._sequence += 1
+            retried = IngestionJob(job.document_id, job.attempts + 1, job.enqueued_at)
+            heapq.heappush(
+                self._delayed, (time.monotonic() + delay, self._sequence, retried)
+            )
+            self._condition.notify()
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._ready) + len(self._delayed)
+
+
+class RedisJobQueue(JobQueue):
+    """Redis 리스트 기반 신뢰성 큐
+
+    꺼낸 작업은 ``BLMOVE`` 로 실행 중 리스트에 옮겨 두고 완료 시 지운다.
+    워커가 중간에 죽으면 ``recover()`` 가 실행 중 리스트를 대기열로 되돌린다.
+    재시도는 실행 시각을 점수로 하는 정렬 집합에 넣어 둔다.
+    중복 확인과 대기열 추가는 ``WATCH``/``MULTI`` 트랜잭션으로 함께 반영한다.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "ingest"):
+        import redis  # type: ignore
+
+        self._client: Any = redis.Redis.from_url(redis_url)
+        self._ready = f"{prefix}:queue"
+        self._processing = f"{prefix}:processing"
+        self._delayed = f"{prefix}:delayed"
+        self._pending = f"{prefix}:pending"
+
+    def enqueue(self, document_id: int) -> bool:
+        added = False
+
+        def add(pipe) -> None:
+            # 대기 집합이 바뀌면 WatchError 로 처음부터 다시 실행된다
+            nonlocal added
+            added = False
+            if pipe.sismember(self._pending, document_id):
+                return
+            pipe.multi()
+            pipe.sadd(self._pending, document_id)
+            pipe.lpush(self._ready, IngestionJob(document_id).dumps())
+            added = True
+
+        self._client.transaction(add, self._pending)
+        return added
+
+    def _promote_delayed(self) -> None:
+        """실행 시각이 된 재시도 작업을 대기열로 이동"""
+        due = self._client.zrangebyscore(self._delayed, 0, time.time())
+        for raw in due:
+            # 다른 워커가 먼저 옮겼으면 zrem 이 0 을 돌려준다
+            if self._client.zrem(self._delayed, raw):
+                self._client.lpush(self._ready, raw)
+
+    def dequeue(self, timeout: float) -> Optional[IngestionJob]:
+        self._promote_delayed()
+        raw = self._client.blmove(
+            self._ready, self._processing, timeout, src="RIGHT", dest="LEFT"
+        )
+        return IngestionJob.loads(raw) if raw is not None else None
+
+    def _remove_processing(self, job: IngestionJob) -> None:
+        # dumps() 는 같은 작업에 대해 항상 같은 문자열을 만든다
+        self._client.lrem(self._processing, 1, job.dumps())
+
+    def ack(self, job: IngestionJob) -> None:
+        self._remove_processing(job)
+        self._client.srem(self._pending, job.document_id)
+
+    def retry(self, job: IngestionJob, delay: float) -> None:
+        retried = IngestionJob(job.document_id, job.attempts + 1, job.enqueued_at)
+        self._client.zadd(self._delayed, {retried.dumps(): time.time() + delay})
+        self._remove_processing(job)
+
+    def depth(self) -> int:
+        return int(self._client.llen(self._ready)) + int(
+            self._client.zcard(self._delayed)
+        )
+
+    def recover(self) -> int:
+        recovered = 0
+        while self._client.lmove(
+            self._processing, self._ready, src="RIGHT", dest="RIGHT"
+        ):
+            recovered += 1
+        if recovered:
+            logger.warning("중단된 문서 처리 작업 %d건을 다시 대기열에 넣음", recovered)
+        return recovered
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """REDIS_URL 이 있으면 Redis 큐, 없으면 프로세스 내 큐"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if settings.REDIS_URL:
+                    _queue = RedisJobQueue(settings.REDIS_URL)
+                else:
+                    _queue = InMemoryJobQueue()
+    return _queue
@@ -0,0 +1,702 @@
+import math
+import os
+import re
+import shutil
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from core.metrics import stage_timer
+from models.document import Document, DocumentChunk  # type: ignore
+from services.index_files import (
+    load_consistent,
+    manifest_mtime,
+    publish_generation,
+    read_manifest,
+    write_manifest,
+)
+from services.vector_store import IdArray, SearchHit
+
+_SEGMENT_ARRAYS = (
+    "term_bytes",
+    "term_bounds",
+    "term_offsets",
+    "gaps",
+    "freqs",
+    "chunk_ids",
+    "document_ids",
+    "user_ids",
+    "lengths",
+)
+_DELTA_FILE = "delta.npz"
+_TOMBSTONE_FILE = "tombstones.npz"
+_MAX_FREQ = np.iinfo(np.uint16).max
+_MAX_IDENTIFIER_LENGTH = 32
+# 델타가 이만큼 쌓이거나 삭제 비율이 높아지면 flush 시 새 세대로 병합
+_COMPACT_DELTA_DOCS = 20_000
+_COMPACT_DEAD_RATIO = 0.3
+
+# 한글·가나·한자는 띄어쓰기·조사와 무관하게 맞도록 문자 바이그램으로 나눈다
+_CJK = "぀-ヿ㄰-㆏一-鿿가-힣"
+_RUN = re.compile(rf"[{_CJK}]+|[^\W_{_CJK}]+")
+_CJK_RUN = re.compile(rf"[{_CJK}]")
+_WORD_SPLIT = re.compile(r"[\s\"'()\[\]{}<>,;:!?。、·…]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25 용 토큰 분리
+
+    - 한글 등 CJK 연속 구간: 문자 바이그램 (한 글자면 그대로)
+    - 영문·숫자 구간: 단어 그대로
+    - 숫자가 섞인 어절(부품 번호 ``AB-1234``, 조항 ``제3조`` 등): 어절 전체도
+      토큰으로 추가해 정확히 일치하는 식별자가 높은 점수를 받게 한다
+    """
+    tokens: List[str] = []
+    for word in _WORD_SPLIT.split(unicodedata.normalize("NFKC", text).lower()):
+        word = word.strip(".")
+        if not word:
+            continue
+        runs = _RUN.findall(word)
+        if (
+            len(runs) > 1
+            and len(word) <= _MAX_IDENTIFIER_LENGTH
+            and any(ch.isdigit() for ch in word)
+        ):
+            tokens.append(word)
+        for run in runs:
+            if _CJK_RUN.match(run) and len(run) > 1:
+                tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+    return tokens
+
+
+class _Postings:
+    """증분 추가용 포스팅 (문서 번호 간격과 빈도를 배열에 누적)"""
+
+    __slots__ = ("gaps", "freqs", "last")
+
+    def __init__(self):
+        self.gaps = array("I")
+        self.freqs = array("H")
+        self.last = 0
+
+    def append(self, docno: int, freq: int) -> None:
+        self.gaps.append(docno - self.last)
+        self.freqs.append(min(freq, _MAX_FREQ))
+        self.last = docno
+
+
+def _encode_terms(terms: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """용어 목록을 UTF-8 바이트 배열과 경계 오프셋으로 인코딩"""
+    encoded = [term.encode("utf-8") for term in terms]
+    bounds = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=bounds[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), bounds
+
+
+def _decode_terms(term_bytes: np.ndarray, bounds: np.ndarray) -> List[str]:
+    raw = term_bytes.tobytes()
+    return [
+        raw[start:end].decode("utf-8")
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+    ]
+
+
+def _decode_postings(
+    gaps: np.ndarray, term_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """세그먼트 전체 포스팅을 (용어 번호, 문서 번호) 로 한 번에 복원"""
+    counts = np.diff(term_offsets)
+    term_index = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    running = np.cumsum(gaps, dtype=np.int64)
+    # 용어가 바뀌는 지점마다 누적합 기준점을 되돌린다
+    starts = term_offsets[:-1][counts > 0]
+    base = np.zeros(len(counts), dtype=np.int64)
+    base[counts > 0] = np.where(starts > 0, running[np.maximum(starts - 1, 0)], 0)
+    return term_index, running - base[term_index]
+
+
+class _Segment:
+    """불변 포스팅 세그먼트 (용어 사전 + 델타 인코딩 포스팅 + 문서 메타데이터)
+
+    용어 사전은 정렬된 UTF-8 바이트와 경계 오프셋 그대로 두고 이진 탐색으로
+    찾으므로 메모리 맵으로 열어도 용어 수에 비례하는 디코딩이 없다.
+    """
+
+    # ``__init__`` 이 _SEGMENT_ARRAYS 를 속성으로 채운다
+    term_bytes: np.ndarray
+    term_bounds: np.ndarray
+    term_offsets: np.ndarray
+    gaps: np.ndarray
+    freqs: np.ndarray
+    chunk_ids: np.ndarray
+    document_ids: np.ndarray
+    user_ids: np.ndarray
+    lengths: np.ndarray
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        for key in _SEGMENT_ARRAYS:
+            setattr(self, key, arrays[key])
+
+    @staticmethod
+    def empty() -> "_Segment":
+        int64 = np.empty(0, dtype=np.int64)
+        return _Segment(
+            {
+                "term_bytes": np.empty(0, dtype=np.uint8),
+                "term_bounds": np.zeros(1, dtype=np.int64),
+                "term_offsets": np.zeros(1, dtype=np.int64),
+                "gaps": np.empty(0, dtype=np.uint32),
+                "freqs": np.empty(0, dtype=np.uint16),
+                "chunk_ids": int64,
+                "document_ids": int64,
+                "user_ids": int64,
+                "lengths": np.empty(0, dtype=np.uint32),
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @cached_property
+    def terms(self) -> List[str]:
+        """전체 용어 목록 (병합·델타 복원 등 작성자 경로에서만 디코딩)"""
+        return _decode_terms(self.term_bytes, self.term_bounds)
+
+    @property
+    def term_count(self) -> int:
+        return len(self.term_bounds) - 1
+
+    def term_id(self, term: str) -> Optional[int]:
+        """정렬된 용어 사전에서 이진 탐색 (UTF-8 바이트 순 = 코드 포인트 순)"""
+        key = term.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            mid = (low + high) // 2
+            start, end = self.term_bounds[mid], self.term_bounds[mid + 1]
+            if self.term_bytes[start:end].tobytes() < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.term_count:
+            start, end = self.term_bounds[low], self.term_bounds[low + 1]
+            if self.term_bytes[start:end].tobytes() == key:
+                return low
+        return None
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        term_id = self.term_id(term)
+        if term_id is None:
+            return np.empty(0, np.int64), np.empty(0, np.uint16)
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return np.cumsum(self.gaps[start:end], dtype=np.int64), self.freqs[start:end]
+
+
+class LexicalIndex:
+    """DocumentChunk.content 에 대한 BM25 역색인
+
+    구조는 ``LocalVectorStore`` 와 같다. 기본 세그먼트는 용어별 문서 번호
+    간격(uint32)·빈도(uint16) 배열을 읽기 전용 메모리 맵으로 열고, 새 청크는
+    메모리의 델타 포스팅에 바로 추가하며, 삭제는 툼스톤으로 가렸다가
+    ``compact()`` 에서 제거한다. ``flush()`` 로 델타와 툼스톤을 기록하면 다른
+    워커는 ``reload_if_stale()`` 로 반영한다. 쓰기는 단일 프로세스에서만
+    수행한다고 가정한다.
+    """
+
+    # ``_load`` 가 읽은 세대 상태 (``_read_state`` 참고)
+    _generation_dir: str
+    _base: _Segment
+    _delta_postings: Dict[str, _Postings]
+    _delta_chunk_ids: array
+    _delta_document_ids: array
+    _delta_user_ids: array
+    _delta_lengths: array
+    _delta_views: Dict[str, np.ndarray]
+    _alive: np.ndarray
+    _alive_count: int
+    _alive_length: int
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._manifest_mtime: Optional[int] = None
+        self._live_chunks: Optional[Set[int]] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # 빌드 / 영속화
+    # ------------------------------------------------------------------
+    @classmethod
+    def create(cls, path: str, k1: float = 1.2, b: float = 0.75) -> "LexicalIndex":
+        """빈 인덱스 세대를 만들고 연다"""
+        os.makedirs(path, exist_ok=True)
+        generation = read_manifest(path).get("generation", 0) + 1
+        cls._write_generation(path, generation, cls._segment_arrays(_Segment.empty()))
+        return cls(path, k1=k1, b=b)
+
+    @staticmethod
+    def _segment_arrays(segment: _Segment) -> Dict[str, np.ndarray]:
+        return {key: getattr(segment, key) for key in _SEGMENT_ARRAYS}
+
+    @staticmethod
+    def _write_generation(
+        path: str, generation: int, arrays: Dict[str, np.ndarray]
+    ) -> None:
+        """기본 세그먼트를 새 세대 디렉터리에 원자적으로 기록
+
+        이전 세대는 ``publish_generation`` 이 유예 시간 동안 남겨 둔다.
+        """
+        name = f"gen-{generation:06d}"
+        tmp_dir = os.path.join(path, name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for key, value in arrays.items():
+            np.save(os.path.join(tmp_dir, key + ".npy"), value)
+        os.rename(tmp_dir, os.path.join(path, name))
+        publish_generation(path, generation, name)
+
+    def _load(self) -> None:
+        """현재 세대의 기본 세그먼트와 델타/툼스톤을 로드
+
+        모든 파일을 지역 변수로 읽은 뒤 잠금 안에서 한 번에 교체하므로 검색은
+        로드가 끝날 때까지 이전 상태를 그대로 쓴다.
+        """
+        if not read_manifest(self.path):
+            raise FileNotFoundError(f"역색인이 없습니다: {self.path}")
+        state, mtime = load_consistent(self.path, self._read_state)
+        with self._lock:
+            for key, value in state.items():
+                setattr(self, key, value)
+            self._live_chunks = None
+            self._manifest_mtime = mtime
+
+    def _read_state(self, manifest: dict) -> Dict[str, Any]:
+        directory = os.path.join(self.path, manifest["directory"])
+        base = _Segment(
+            {
+                key: np.load(os.path.join(directory, key + ".npy"), mmap_mode="r")
+                for key in _SEGMENT_ARRAYS
+            }
+        )
+        state: Dict[str, Any] = {"_generation_dir": directory, "_base": base}
+        state.update(self._restore_delta(self._load_npz(directory, _DELTA_FILE)))
+
+        # 툼스톤은 세대 안에서만 유효한 문서 번호로 기록하므로 같은 문서를
+        # 다시 색인해도 새로 추가된 청크는 가려지지 않는다
+        tombstones = self._load_npz(directory, _TOMBSTONE_FILE)
+        alive = np.ones(len(base) + len(state["_delta_chunk_ids"]), dtype=bool)
+        alive[tombstones.get("docnos", np.empty(0, dtype=np.int64))] = False
+        lengths = np.concatenate(
+            [base.lengths, np.array(state["_delta_lengths"], dtype=np.uint32)]
+        )
+        state["_alive"] = alive
+        state["_alive_count"] = int(alive.sum())
+        state["_alive_length"] = int(lengths[alive].sum())
+        return state
+
+    @staticmethod
+    def _restore_delta(arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """flush 된 델타 세그먼트를 증분 포스팅으로 되돌림"""
+        state: Dict[str, Any] = {
+            "_delta_postings": {},
+            "_delta_chunk_ids": array("q"),
+            "_delta_document_ids": array("q"),
+            "_delta_user_ids": array("q"),
+            "_delta_lengths": array("I"),
+            "_delta_views": {},
+        }
+        if not arrays:
+            return state
+        segment = _Segment(arrays)
+        for term_id, term in enumerate(segment.terms):
+            start = segment.term_offsets[term_id]
+            end = segment.term_offsets[term_id + 1]
+            postings = _Postings()
+            postings.gaps.frombytes(segment.gaps[start:end].tobytes())
+            postings.freqs.frombytes(segment.freqs[start:end].tobytes())
+            postings.last = int(np.sum(segment.gaps[start:end], dtype=np.int64))
+            state["_delta_postings"][term] = postings
+        for key in ("chunk_ids", "document_ids", "user_ids", "lengths"):
+            state["_delta_" + key].frombytes(getattr(segment, key).tobytes())
+        return state
+
+    def _delta_segment(self) -> Dict[str, np.ndarray]:
+        """메모리 델타를 기본 세그먼트와 같은 배열 형식으로 변환"""
+        terms = sorted(self._delta_postings)
+        term_bytes, term_bounds = _encode_terms(terms)
+        postings = [self._delta_postings[term] for term in terms]
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(p.gaps) for p in postings], out=term_offsets[1:])
+        return {
+            "term_bytes": term_bytes,
+            "term_bounds": term_bounds,
+            "term_offsets": term_offsets,
+            "gaps": np.frombuffer(
+                b"".join(p.gaps.tobytes() for p in postings), dtype=np.uint32
+            ),
+            "freqs": np.frombuffer(
+                b"".join(p.freqs.tobytes() for p in postings), dtype=np.uint16
+            ),
+            "chunk_ids": np.array(self._delta_chunk_ids, dtype=np.int64),
+            "document_ids": np.array(self._delta_document_ids, dtype=np.int64),
+            "user_ids": np.array(self._delta_user_ids, dtype=np.int64),
+            "lengths": np.array(self._delta_lengths, dtype=np.uint32),
+        }
+
+    @staticmethod
+    def _load_npz(directory: str, filename: str) -> dict:
+        file_path = os.path.join(directory, filename)
+        if not os.path.exists(file_path):
+            return {}
+        with np.load(file_path) as data:
+            return {key: data[key] for key in data.files}
+
+    def _save_npz(self, filename: str, **arrays: Any) -> None:
+        tmp_path = os.path.join(self._generation_dir, filename + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, os.path.join(self._generation_dir, filename))
+
+    def _delta_view(self, key: str) -> np.ndarray:
+        """델타 메타데이터의 numpy 사본 (추가 시 무효화)"""
+        view = self._delta_views.get(key)
+        if view is None:
+            view = np.array(
+                getattr(self, "_delta_" + key), dtype=getattr(self._base, key).dtype
+            )
+            self._delta_views[key] = view
+        return view
+
+    def _metadata(self, key: str) -> np.ndarray:
+        """기본 + 델타 문서 메타데이터 (문서 번호 순)"""
+        return np.concatenate([getattr(self._base, key), self._delta_view(key)])
+
+    def _live_chunk_set(self) -> Set[int]:
+        """살아 있는 청크 id 집합 (중복 추가 방지용, 작성자가 처음 쓸 때 만듦)"""
+        if self._live_chunks is None:
+            self._live_chunks = set(self._metadata("chunk_ids")[self._alive].tolist())
+        return self._live_chunks
+
+    def _kill(self, dead: np.ndarray) -> None:
+        """문서 번호 마스크에 해당하는 청크를 툼스톤 처리하고 통계 갱신"""
+        dead &= self._alive
+        if not dead.any():
+            return
+        self._alive[dead] = False
+        self._alive_count -= int(dead.sum())
+        self._alive_length -= int(self._metadata("lengths")[dead].sum())
+        if self._live_chunks is not None:
+            self._live_chunks.difference_update(
+                self._metadata("chunk_ids")[dead].tolist()
+            )
+
+    def reload_if_stale(self) -> bool:
+        """다른 프로세스가 인덱스를 갱신했으면 다시 로드"""
+        if manifest_mtime(self.path) == self._manifest_mtime:
+            return False
+        self._load()
+        return True
+
+    def flush(self) -> None:
+        """델타와 툼스톤을 디스크에 기록 (많이 쌓였으면 병합)"""
+        with self._lock:
+            total = len(self._alive)
+            dead = total - self._alive_count
+            if len(self._delta_chunk_ids) >= _COMPACT_DELTA_DOCS or (
+                total and dead / total >= _COMPACT_DEAD_RATIO
+            ):
+                self.compact()
+                return
+            self._save_npz(_DELTA_FILE, **self._delta_segment())
+            self._save_npz(_TOMBSTONE_FILE, docnos=np.flatnonzero(~self._alive))
+            manifest = read_manifest(self.path)
+            manifest["revision"] = manifest.get("revision", 0) + 1
+            write_manifest(self.path, manifest)
+            self._manifest_mtime = manifest_mtime(self.path)
+
+    def compact(self) -> None:
+        """델타를 병합하고 삭제된 문서를 제거한 새 세대를 기록
+
+        두 세그먼트의 포스팅을 한 번에 복원해 (용어, 문서 번호) 순으로
+        정렬한 뒤 살아 있는 문서 번호를 다시 매기고 간격으로 인코딩한다.
+        """
+        with self._lock:
+            delta = _Segment(self._delta_segment())
+            vocabulary = sorted(set(self._base.terms) | set(delta.terms))
+            ranks = {term: i for i, term in enumerate(vocabulary)}
+
+            term_parts, docno_parts, freq_parts = [], [], []
+            # 델타 포스팅도 전역 문서 번호로 인코딩돼 있다
+            for segment in (self._base, delta):
+                term_index, docnos = _decode_postings(
+                    segment.gaps, segment.term_offsets
+                )
+                segment_ranks = np.asarray(
+                    [ranks[term] for term in segment.terms], dtype=np.int64
+                )
+                term_parts.append(segment_ranks[term_index])
+                docno_parts.append(docnos)
+                freq_parts.append(np.asarray(segment.freqs))
+            terms = np.concatenate(term_parts)
+            docnos = np.concatenate(docno_parts)
+            freqs = np.concatenate(freq_parts)
+
+            alive = self._alive
+            keep = alive[docnos]
+            terms, docnos, freqs = terms[keep], docnos[keep], freqs[keep]
+            docnos = (np.cumsum(alive) - 1)[docnos]
+            order = np.lexsort((docnos, terms))
+            terms, docnos, freqs = terms[order], docnos[order], freqs[order]
+
+            counts = np.bincount(terms, minlength=len(vocabulary))
+            used = counts > 0
+            vocabulary = [term for term, u in zip(vocabulary, used) if u]
+            term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+            np.cumsum(counts[used], out=term_offsets[1:])
+            gaps = np.diff(docnos, prepend=0)
+            gaps[term_offsets[:-1]] = docnos[term_offsets[:-1]]
+            term_bytes, term_bounds = _encode_terms(vocabulary)
+
+            generation = read_manifest(self.path)["generation"] + 1
+            self._write_generation(
+                self.path,
+                generation,
+                {
+                    "term_bytes": term_bytes,
+                    "term_bounds": term_bounds,
+                    "term_offsets": term_offsets,
+                    "gaps": gaps.astype(np.uint32),
+                    "freqs": freqs.astype(np.uint16),
+                    "chunk_ids": self._metadata("chunk_ids")[alive],
+                    "document_ids": self._metadata("document_ids")[alive],
+                    "user_ids": self._metadata("user_ids")[alive],
+                    "lengths": self._metadata("lengths")[alive].astype(np.uint32),
+                },
+            )
+            self._load()
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        chunk_ids: IdArray,
+        document_ids: IdArray,
+        user_ids: IdArray,
+        texts: Sequence[str],
+    ) -> int:
+        """청크를 델타 포스팅에 추가 (이미 색인된 청크는 건너뜀)"""
+        added = 0
+        with self._lock:
+            live_chunks = self._live_chunk_set()
+            for chunk_id, document_id, user_id, text in zip(
+                chunk_ids, document_ids, user_ids, texts
+            ):
+                chunk_id = int(chunk_id)
+                if chunk_id in live_chunks:
+                    continue
+                tokens = tokenize(text)
+                docno = len(self._base) + len(self._delta_chunk_ids)
+                for term, freq in Counter(tokens).items():
+                    postings = self._delta_postings.get(term)
+                    if postings is None:
+                        postings = self._delta_postings[term] = _Postings()
+                    postings.append(docno, freq)
+                self._delta_chunk_ids.append(chunk_id)
+                self._delta_document_ids.append(int(document_id))
+                self._delta_user_ids.append(int(user_id))
+                self._delta_lengths.append(len(tokens))
+                live_chunks.add(chunk_id)
+                self._alive_count += 1
+                self._alive_length += len(tokens)
+                added += 1
+            if added:
+                self._alive = np.concatenate([self._alive, np.ones(added, bool)])
+                self._delta_views.clear()
+        return added
+
+    def delete_documents(self, document_ids: IdArray) -> None:
+        """문서 단위 삭제 (툼스톤)"""
+        with self._lock:
+            self._kill(np.isin(self._metadata("document_ids"), document_ids))
+
+    def delete_chunks(self, chunk_ids: IdArray) -> None:
+        """청크 단위 삭제 (툼스톤)"""
+        with self._lock:
+            self._kill(np.isin(self._metadata("chunk_ids"), chunk_ids))
+
+    def document_chunk_ids(self, document_id: int) -> np.ndarray:
+        """문서의 살아 있는 청크 id"""
+        with self._lock:
+            mask = self._alive & (self._metadata("document_ids") == document_id)
+            return self._metadata("chunk_ids")[mask]
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """기본 + 델타 포스팅을 전역 문서 번호로 복원"""
+        docnos, freqs = self._base.postings(term)
+        delta = self._delta_postings.get(term)
+        if delta is None:
+            return docnos, freqs
+        delta_docnos = np.cumsum(np.array(delta.gaps, dtype=np.int64))
+        return (
+            np.concatenate([docnos, delta_docnos]),
+            np.concatenate([freqs, np.array(delta.freqs, dtype=np.uint16)]),
+        )
+
+    def _gather(self, key: str, docnos: np.ndarray) -> np.ndarray:
+        """문서 번호 배열에 해당하는 메타데이터 조회"""
+        base = getattr(self._base, key)
+        delta = self._delta_view(key)
+        out = np.empty(len(docnos), dtype=base.dtype)
+        in_base = docnos < len(self._base)
+        out[in_base] = base[docnos[in_base]]
+        out[~in_base] = delta[docnos[~in_base] - len(self._base)]
+        return out
+
+    @stage_timer("lexical_search")
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        user_id: Optional[int] = None,
+        document_ids: Optional[Sequence[int]] = None,
+    ) -> List[SearchHit]:
+        """BM25 top-k 검색 (사용자·문서 필터를 점수 계산 전에 적용)"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            count = self._alive_count
+            if count == 0:
+                return []
+            average_length = self._alive_length / count
+            docno_parts, score_parts = [], []
+            for term in terms:
+                docnos, freqs = self._postings(term)
+                if len(docnos) == 0:
+                    continue
+                # df 는 병합 전까지 삭제된 문서를 포함한다 (Lucene 과 같은 근사)
+                df = len(docnos)
+                idf = math.log(1.0 + (count - df + 0.5) / (df + 0.5))
+                tf = freqs.astype(np.float32)
+                lengths = self._gather("lengths", docnos).astype(np.float32)
+                norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+                docno_parts.append(docnos)
+                score_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+            if not docno_parts:
+                return []
+
+            docnos, inverse = np.unique(
+                np.concatenate(docno_parts), return_inverse=True
+            )
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+            valid = self._alive[docnos]
+            if user_id is not None:
+                valid &= self._gather("user_ids", docnos) == user_id
+            if document_ids is not None:
+                valid &= np.isin(self._gather("document_ids", docnos), document_ids)
+            docnos, scores = docnos[valid], scores[valid]
+
+            top = np.argsort(-scores, kind="stable")[:k]
+            chunk_ids = self._gather("chunk_ids", docnos[top])
+            owners = self._gather("document_ids", docnos[top])
+            return [
+                SearchHit(
+                    chunk_id=int(chunk_id),
+                    document_id=int(document_id),
+                    score=float(score),
+                )
+                for chunk_id, document_id, score in zip(chunk_ids, owners, scores[top])
+            ]
+
+    def stats(self) -> dict:
+        """색인 크기 (청크 수, 용어 수, 포스팅 바이트)"""
+        with self._lock:
+            delta_postings = sum(len(p.gaps) for p in self._delta_postings.values())
+            new_terms = sum(
+                self._base.term_id(term) is None for term in self._delta_postings
+            )
+            return {
+                "chunks": self._alive_count,
+                "base_chunks": len(self._base),
+                "delta_chunks": len(self._delta_chunk_ids),
+                "terms": self._base.term_count + new_terms,
+                "postings_bytes": int(
+                    self._base.gaps.nbytes
+                    + self._base.freqs.nbytes
+                    + delta_postings * 6
+                ),
+            }
+
+
+def build_lexical_index(db: Session, path: str, batch_size: int = 1000) -> LexicalIndex:
+    """DB 의 모든 청크로 역색인을 새로 빌드 (id 키셋 단위로 스트리밍)"""
+    index = LexicalIndex.create(path, k1=settings.BM25_K1, b=settings.BM25_B)
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(
+                DocumentChunk.id,
+                DocumentChunk.document_id,
+                Document.user_id,
+                DocumentChunk.content,
+            )
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .where(DocumentChunk.id > last_id)
+            .order_by(DocumentChunk.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        chunk_ids, document_ids, user_ids, texts = zip(*rows)
+        index.add(chunk_ids, document_ids, user_ids, texts)
+        last_id = rows[-1][0]
+    index.compact()
+    return index
+
+
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """프로세스 공용 역색인 (읽기용)
+
+    역색인은 수집 워커가 ``ensure_lexical_index`` 로 만든다. 아직 없으면
+    FileNotFoundError 를 낸다.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LexicalIndex(
+                    settings.LEXICAL_INDEX_DIR, k1=settings.BM25_K1, b=settings.BM25_B
+                )
+    return _index
+
+
+def ensure_lexical_index(db: Session) -> LexicalIndex:
+    """역색인을 열고, 없으면 DB 청크로 빌드 (작성자 전용)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = settings.LEXICAL_INDEX_DIR
+            try:
+                _index = LexicalIndex(path, k1=settings.BM25_K1, b=settings.BM25_B)
+            except FileNotFoundError:
+                _index = build_lexical_index(db, path)
+    return _index
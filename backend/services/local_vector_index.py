@@ -0,0 +1,541 @@
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from core.metrics import stage_timer
+from services.index_files import (
+    load_consistent,
+    manifest_mtime,
+    publish_generation,
+    read_manifest,
+    write_manifest,
+)
+from services.vector_store import IdArray, SearchHit, VectorStore
+
+_BASE_ARRAYS = (
+    "centroids",
+    "offsets",
+    "vectors",
+    "chunk_ids",
+    "document_ids",
+    "user_ids",
+)
+# 사용자별 행 번호 (user_ids 기준 안정 정렬). 이전 세대에는 없을 수 있다
+_USER_ROWS = "user_rows"
+_DELTA_FILE = "delta.npz"
+_TOMBSTONE_FILE = "tombstones.npz"
+_NO_USER = -1
+_QUERY_BLOCK = 64
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 256
+# flush 때 델타가 이만큼(기본 세그먼트 대비 비율과 최소 건수 중 큰 값) 쌓이거나
+# 툼스톤 비율이 넘으면 새 세대로 병합한다
+_COMPACT_DELTA_MIN = 5_000
+_COMPACT_DELTA_RATIO = 0.1
+_COMPACT_DEAD_RATIO = 0.3
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """코사인 유사도를 내적으로 계산하기 위한 행 단위 정규화"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """구면 k-means 로 IVF 리스트 중심 학습"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * _KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        filled = np.bincount(assignment, minlength=nlist) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids
+
+
+def _default_nlist(count: int) -> int:
+    """데이터 크기에 맞춘 IVF 리스트 수 (대략 sqrt(N))"""
+    return max(1, min(count, int(np.sqrt(count))))
+
+
+def _alive_mask(
+    chunk_ids: np.ndarray,
+    document_ids: np.ndarray,
+    dead_documents: set,
+    dead_chunks: set,
+) -> np.ndarray:
+    """툼스톤을 반영한 기본 세그먼트 생존 마스크"""
+    alive = np.ones(len(chunk_ids), dtype=np.bool_)
+    if dead_documents:
+        alive &= ~np.isin(document_ids, list(dead_documents))
+    if dead_chunks:
+        alive &= ~np.isin(chunk_ids, list(dead_chunks))
+    return alive
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """행마다 점수 상위 k 개의 열 인덱스를 내림차순으로 반환"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+class LocalVectorStore(VectorStore):
+    """메모리 맵 파일 기반 IVF 벡터 인덱스
+
+    기본 세그먼트는 IVF 리스트 순으로 정렬된 ``.npy`` 파일을 읽기 전용
+    메모리 맵으로 열어 워커 간에 페이지를 공유한다. 증분 추가분은 델타
+    세그먼트에, 삭제는 툼스톤에 쌓았다가 ``compact()`` 에서 병합한다.
+    쓰기는 단일 프로세스에서만 수행한다고 가정한다.
+    """
+
+    # 기본 세그먼트 (``_load`` 가 _BASE_ARRAYS 를 메모리 맵으로 채운다)
+    _centroids: np.ndarray
+    _offsets: np.ndarray
+    _vectors: np.ndarray
+    _chunk_ids: np.ndarray
+    _document_ids: np.ndarray
+    _user_ids: np.ndarray
+    _alive: np.ndarray
+
+    _user_rows: np.ndarray
+    _user_keys: np.ndarray
+    _generation_dir: str
+    _dim: int
+
+    # 델타 세그먼트와 툼스톤
+    _delta_vectors: np.ndarray
+    _delta_chunk_ids: np.ndarray
+    _delta_document_ids: np.ndarray
+    _delta_user_ids: np.ndarray
+    _dead_documents: Set[int]
+    _dead_chunks: Set[int]
+
+    def __init__(self, path: str, nprobe: int = 8):
+        self.path = path
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._manifest_mtime: Optional[int] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # 빌드 / 영속화
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        chunk_ids: IdArray,
+        document_ids: IdArray,
+        user_ids: IdArray,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+    ) -> "LocalVectorStore":
+        """벡터로부터 새 인덱스 세대를 만들고 연다"""
+        os.makedirs(path, exist_ok=True)
+        generation = read_manifest(path).get("generation", 0) + 1
+        cls._write_generation(
+            path,
+            generation,
+            _normalize(vectors),
+            np.asarray(chunk_ids, dtype=np.int64),
+            np.asarray(document_ids, dtype=np.int64),
+            np.asarray(user_ids, dtype=np.int64),
+            nlist,
+        )
+        return cls(path, nprobe=nprobe)
+
+    @staticmethod
+    def _write_generation(
+        path: str,
+        generation: int,
+        vectors: np.ndarray,
+        chunk_ids: np.ndarray,
+        document_ids: np.ndarray,
+        user_ids: np.ndarray,
+        nlist: Optional[int],
+    ) -> None:
+        """IVF 리스트 순으로 정렬한 세그먼트를 원자적으로 기록
+
+        이전 세대 디렉터리는 로드 중인 다른 프로세스를 위해 유예 시간 동안
+        남겨 둔다 (``publish_generation``).
+        """
+        if len(vectors):
+            nlist = min(nlist or _default_nlist(len(vectors)), len(vectors))
+            centroids = _train_centroids(vectors, nlist)
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+        else:
+            centroids = np.empty((0, vectors.shape[1]), dtype=np.float32)
+            assignment = np.empty(0, dtype=np.int64)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=len(centroids))
+        arrays: Dict[str, np.ndarray] = {
+            "centroids": centroids.astype(np.float32),
+            "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            "vectors": np.ascontiguousarray(vectors[order], dtype=np.float32),
+            "chunk_ids": chunk_ids[order],
+            "document_ids": document_ids[order],
+            "user_ids": user_ids[order],
+            _USER_ROWS: np.argsort(user_ids[order], kind="stable").astype(np.int64),
+        }
+        name = f"gen-{generation:06d}"
+        tmp_dir = os.path.join(path, name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for key, array in arrays.items():
+            np.save(os.path.join(tmp_dir, key + ".npy"), array)
+        os.rename(tmp_dir, os.path.join(path, name))
+        publish_generation(path, generation, name)
+
+    def _load(self) -> None:
+        """현재 세대의 기본 세그먼트와 델타/툼스톤을 로드
+
+        모든 파일을 지역 변수로 읽은 뒤에 한 번에 교체하므로 로드 도중
+        작성자가 세대를 바꿔도 서로 다른 세대가 섞이지 않는다.
+        """
+        if not read_manifest(self.path):
+            raise FileNotFoundError(f"벡터 인덱스가 없습니다: {self.path}")
+        state, mtime = load_consistent(self.path, self._read_state)
+        with self._lock:
+            for key, value in state.items():
+                setattr(self, key, value)
+            self._manifest_mtime = mtime
+
+    def _read_state(self, manifest: dict) -> Dict[str, Any]:
+        directory = os.path.join(self.path, manifest["directory"])
+        state: Dict[str, Any] = {"_generation_dir": directory}
+        for key in _BASE_ARRAYS:
+            state["_" + key] = np.load(
+                os.path.join(directory, key + ".npy"), mmap_mode="r"
+            )
+        user_ids = state["_user_ids"]
+        user_rows_path = os.path.join(directory, _USER_ROWS + ".npy")
+        if os.path.exists(user_rows_path):
+            user_rows = np.load(user_rows_path, mmap_mode="r")
+        else:
+            user_rows = np.argsort(user_ids, kind="stable")
+        state["_user_rows"] = user_rows
+        state["_user_keys"] = np.asarray(user_ids[user_rows])
+        dim = state["_centroids"].shape[1]
+        state["_dim"] = dim
+
+        delta = self._load_npz(directory, _DELTA_FILE)
+        state["_delta_vectors"] = delta.get(
+            "vectors", np.empty((0, dim), dtype=np.float32)
+        )
+        for key in ("chunk_ids", "document_ids", "user_ids"):
+            state["_delta_" + key] = delta.get(key, np.empty(0, np.int64))
+
+        tombstones = self._load_npz(directory, _TOMBSTONE_FILE)
+        empty = np.empty(0, dtype=np.int64)
+        dead_documents = set(tombstones.get("documents", empty).tolist())
+        dead_chunks = set(tombstones.get("chunks", empty).tolist())
+        state["_dead_documents"] = dead_documents
+        state["_dead_chunks"] = dead_chunks
+        state["_alive"] = _alive_mask(
+            state["_chunk_ids"], state["_document_ids"], dead_documents, dead_chunks
+        )
+        return state
+
+    @staticmethod
+    def _load_npz(directory: str, filename: str) -> dict:
+        file_path = os.path.join(directory, filename)
+        if not os.path.exists(file_path):
+            return {}
+        with np.load(file_path) as data:
+            return {key: data[key] for key in data.files}
+
+    def _save_npz(self, filename: str, **arrays: Any) -> None:
+        tmp_path = os.path.join(self._generation_dir, filename + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, os.path.join(self._generation_dir, filename))
+
+    def _refresh_alive(self) -> None:
+        """툼스톤을 반영한 기본 세그먼트 생존 마스크 재계산"""
+        self._alive = _alive_mask(
+            self._chunk_ids, self._document_ids, self._dead_documents, self._dead_chunks
+        )
+
+    def reload_if_stale(self) -> bool:
+        """다른 프로세스가 인덱스를 갱신했으면 다시 로드"""
+        if manifest_mtime(self.path) == self._manifest_mtime:
+            return False
+        self._load()
+        return True
+
+    def flush(self) -> None:
+        """델타와 툼스톤을 디스크에 기록하고 다른 워커에 갱신을 알림
+
+        델타나 삭제분이 많이 쌓였으면 대신 ``compact()`` 로 새 세대를 만든다.
+        """
+        with self._lock:
+            if self._should_compact():
+                self.compact()
+                return
+            self._save_npz(
+                _DELTA_FILE,
+                vectors=self._delta_vectors,
+                chunk_ids=self._delta_chunk_ids,
+                document_ids=self._delta_document_ids,
+                user_ids=self._delta_user_ids,
+            )
+            self._save_npz(
+                _TOMBSTONE_FILE,
+                documents=np.asarray(sorted(self._dead_documents), dtype=np.int64),
+                chunks=np.asarray(sorted(self._dead_chunks), dtype=np.int64),
+            )
+            manifest = read_manifest(self.path)
+            manifest["revision"] = manifest.get("revision", 0) + 1
+            write_manifest(self.path, manifest)
+            self._manifest_mtime = manifest_mtime(self.path)
+
+    def _should_compact(self) -> bool:
+        total = len(self._alive)
+        dead = total - int(np.count_nonzero(self._alive))
+        threshold = max(_COMPACT_DELTA_MIN, _COMPACT_DELTA_RATIO * total)
+        return len(self._delta_chunk_ids) >= threshold or bool(
+            total and dead / total >= _COMPACT_DEAD_RATIO
+        )
+
+    def compact(self, nlist: Optional[int] = None) -> None:
+        """델타를 병합하고 삭제분을 제거한 새 세대를 기록"""
+        with self._lock:
+            alive = self._alive
+            vectors = np.concatenate([self._vectors[alive], self._delta_vectors])
+            generation = read_manifest(self.path)["generation"] + 1
+            self._write_generation(
+                self.path,
+                generation,
+                vectors.reshape(-1, self._dim),
+                np.concatenate([self._chunk_ids[alive], self._delta_chunk_ids]),
+                np.concatenate([self._document_ids[alive], self._delta_document_ids]),
+                np.concatenate([self._user_ids[alive], self._delta_user_ids]),
+                nlist,
+            )
+            self._load()
+
+    # ------------------------------------------------------------------
+    # VectorStore 구현
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        chunk_ids: IdArray,
+        document_ids: IdArray,
+        user_ids: IdArray,
+        vectors: np.ndarray,
+    ) -> None:
+        """델타 세그먼트에 벡터 추가"""
+        vectors = _normalize(vectors)
+        if vectors.shape[1] != self._dim:
+            raise ValueError(f"벡터 차원 불일치: {vectors.shape[1]} != {self._dim}")
+        with self._lock:
+            self._delta_vectors = np.concatenate([self._delta_vectors, vectors])
+            self._delta_chunk_ids = np.concatenate(
+                [self._delta_chunk_ids, np.asarray(chunk_ids, dtype=np.int64)]
+            )
+            self._delta_document_ids = np.concatenate(
+                [self._delta_document_ids, np.asarray(document_ids, dtype=np.int64)]
+            )
+            self._delta_user_ids = np.concatenate(
+                [self._delta_user_ids, np.asarray(user_ids, dtype=np.int64)]
+            )
+
+    def delete_documents(self, document_ids: IdArray) -> None:
+        """문서 단위 삭제 (기본 세그먼트는 툼스톤, 델타는 즉시 제거)"""
+        with self._lock:
+            self._dead_documents.update(int(i) for i in document_ids)
+            self._drop_delta(~np.isin(self._delta_document_ids, document_ids))
+            self._refresh_alive()
+
+    def delete_chunks(self, chunk_ids: IdArray) -> None:
+        """청크 단위 삭제"""
+        with self._lock:
+            self._dead_chunks.update(int(i) for i in chunk_ids)
+            self._drop_delta(~np.isin(self._delta_chunk_ids, chunk_ids))
+            self._refresh_alive()
+
+    def document_chunk_ids(self, document_id: int) -> np.ndarray:
+        """문서의 살아 있는 청크 id (기본 + 델타)"""
+        with self._lock:
+            base = self._chunk_ids[self._alive & (self._document_ids == document_id)]
+            delta = self._delta_chunk_ids[self._delta_document_ids == document_id]
+            return np.concatenate([base, delta])
+
+    def _drop_delta(self, keep: np.ndarray) -> None:
+        self._delta_vectors = self._delta_vectors[keep]
+        self._delta_chunk_ids = self._delta_chunk_ids[keep]
+        self._delta_document_ids = self._delta_document_ids[keep]
+        self._delta_user_ids = self._delta_user_ids[keep]
+
+    @stage_timer("vector_search")
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        user_ids: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        document_ids: Optional[IdArray] = None,
+    ) -> List[List[SearchHit]]:
+        """여러 쿼리를 한 번에 top-k 검색
+
+        ``user_ids`` (쿼리별) 와 ``document_ids`` (모든 쿼리 공통) 가 주어지면
+        조건에 맞는 행만 후보로 삼아 top-k 를 고르므로 결과 수가 필터로
+        줄어들지 않는다. 조건에 맞는 행이 적으면 IVF 를 거치지 않고 그 행만
+        정확히 채점하고, 많으면 그 행이 있는 IVF 리스트만 탐색한다.
+        """
+        queries = _normalize(queries)
+        query_users = self._query_users(user_ids, len(queries))
+        allowed = None if document_ids is None else np.asarray(document_ids, np.int64)
+        results: List[List[SearchHit]] = [[] for _ in range(len(queries))]
+        with self._lock:
+            for user in np.unique(query_users):
+                positions = np.flatnonzero(query_users == user)
+                for start in range(0, len(positions), _QUERY_BLOCK):
+                    block = positions[start : start + _QUERY_BLOCK]
+                    hits = self._search_block(queries[block], k, int(user), allowed)
+                    for position, row in zip(block, hits):
+                        results[position] = row
+        return results
+
+    @staticmethod
+    def _query_users(
+        user_ids: Optional[Union[int, Sequence[Optional[int]]]], count: int
+    ) -> np.ndarray:
+        if user_ids is None:
+            return np.full(count, _NO_USER, dtype=np.int64)
+        if isinstance(user_ids, (int, np.integer)):
+            return np.full(count, user_ids, dtype=np.int64)
+        if len(user_ids) != count:
+            raise ValueError("user_ids 길이가 쿼리 수와 다릅니다")
+        return np.asarray(
+            [_NO_USER if u is None else u for u in user_ids], dtype=np.int64
+        )
+
+    def _search_block(
+        self,
+        queries: np.ndarray,
+        k: int,
+        user: int,
+        allowed: Optional[np.ndarray],
+    ) -> List[List[SearchHit]]:
+        """같은 사용자 조건의 쿼리 묶음을 기본 + 델타 세그먼트에서 검색"""
+        base_scores, base_rows = self._score_base(queries, k, user, allowed)
+        delta_scores = queries @ self._delta_vectors.T
+        delta_valid = np.ones(len(self._delta_chunk_ids), dtype=bool)
+        if user != _NO_USER:
+            delta_valid &= self._delta_user_ids == user
+        if allowed is not None:
+            delta_valid &= np.isin(self._delta_document_ids, allowed)
+        delta_scores[:, ~delta_valid] = -np.inf
+
+        scores = np.concatenate([base_scores, delta_scores], axis=1)
+        chunk_ids = np.concatenate([self._chunk_ids[base_rows], self._delta_chunk_ids])
+        document_ids = np.concatenate(
+            [self._document_ids[base_rows], self._delta_document_ids]
+        )
+        top = _top_k(scores, k)
+        hits: List[List[SearchHit]] = []
+        for row, columns in enumerate(top):
+            hits.append(
+                [
+                    SearchHit(
+                        chunk_id=int(chunk_ids[col]),
+                        document_id=int(document_ids[col]),
+                        score=float(scores[row, col]),
+                    )
+                    for col in columns
+                    if np.isfinite(scores[row, col])
+                ]
+            )
+        return hits
+
+    def _eligible_rows(self, user: int, allowed: Optional[np.ndarray]) -> np.ndarray:
+        """사용자·문서 조건에 맞는 살아 있는 기본 세그먼트 행 (오름차순)"""
+        if user == _NO_USER:
+            rows = np.arange(len(self._chunk_ids), dtype=np.int64)
+        else:
+            start, end = np.searchsorted(self._user_keys, [user, user + 1])
+            # 안정 정렬이라 같은 사용자의 행 번호는 이미 오름차순이다
+            rows = np.asarray(self._user_rows[start:end], dtype=np.int64)
+        keep = self._alive[rows]
+        if allowed is not None:
+            keep &= np.isin(self._document_ids[rows], allowed)
+        return rows[keep]
+
+    def _score_base(
+        self,
+        queries: np.ndarray,
+        k: int,
+        user: int,
+        allowed: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """기본 세그먼트 채점 (열은 반환한 행 번호 순, 제외된 칸은 -inf)"""
+        nlist = len(self._centroids)
+        if nlist == 0:
+            return np.empty((len(queries), 0), np.float32), np.empty(0, np.int64)
+        nprobe = min(self.nprobe, nlist)
+        centroid_scores = queries @ self._centroids.T
+        if user == _NO_USER and allowed is None:
+            probes = _top_k(centroid_scores, nprobe)
+            return self._score_lists(queries, probes, self._alive)
+
+        eligible = self._eligible_rows(user, allowed)
+        # 탐색할 리스트들의 평균 크기만큼이면 IVF 없이 정확히 채점한다
+        exact_limit = max(k, nprobe * -(-len(self._chunk_ids) // nlist))
+        if len(eligible) <= exact_limit:
+            return queries @ self._vectors[eligible].T, eligible
+
+        # 조건에 맞는 행이 있는 리스트만 가까운 순으로, 최소 nprobe 개를 탐색하되
+        # 모든 쿼리의 후보가 k 개 이상이 될 때까지 늘린다
+        counts = np.bincount(
+            np.searchsorted(self._offsets, eligible, side="right") - 1,
+            minlength=nlist,
+        )
+        centroid_scores[:, counts == 0] = -np.inf
+        order = np.argsort(-centroid_scores, axis=1)
+        covered = np.cumsum(counts[order], axis=1)
+        depth = np.maximum(
+            np.argmax(covered >= min(k, len(eligible)), axis=1) + 1,
+            min(nprobe, int(np.count_nonzero(counts))),
+        )
+        probes = order[:, : int(depth.max())]
+        mask = np.zeros(len(self._chunk_ids), dtype=bool)
+        mask[eligible] = True
+        return self._score_lists(queries, probes, mask)
+
+    def _score_lists(
+        self, queries: np.ndarray, probes: np.ndarray, eligible: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """탐색할 IVF 리스트의 합집합을 한 번의 행렬곱으로 채점
+
+        ``eligible`` 은 기본 세그먼트 행 마스크다. 쿼리별로 탐색하지 않은
+        리스트의 칸은 -inf 로 둔다.
+        """
+        nlist = len(self._centroids)
+        probed = np.zeros((len(queries), nlist), dtype=bool)
+        np.put_along_axis(probed, probes, True, axis=1)
+
+        lists = np.flatnonzero(probed.any(axis=0))
+        starts, ends = self._offsets[lists], self._offsets[lists + 1]
+        rows = np.concatenate(
+            [np.arange(s, e) for s, e in zip(starts, ends)] or [np.empty(0, np.int64)]
+        ).astype(np.int64)
+        row_lists = np.repeat(lists, ends - starts)
+        keep = eligible[rows]
+        rows, row_lists = rows[keep], row_lists[keep]
+
+        scores = queries @ self._vectors[rows].T
+        scores[~probed[:, row_lists]] = -np.inf
+        return scores, rows
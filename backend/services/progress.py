@@ -0,0 +1,117 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TTL = 24 * 60 * 60
+
+
+@dataclass
+class IngestionProgress:
+    """문서 처리 진행 상태"""
+
+    document_id: int
+    # uploaded / queued / parsing / indexing / completed / failed
+    stage: str = "uploaded"
+    fraction: float = 0.0
+    processed_chunks: int = 0
+    reused_chunks: int = 0  # 이전 버전에서 임베딩째 재사용한 청크
+    embedded_chunks: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.stage in ("completed", "failed")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ProgressTracker:
+    """프로세스 내 진행 상태 저장소 (스레드 안전)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: Dict[int, IngestionProgress] = {}
+
+    def update(self, document_id: int, **changes) -> IngestionProgress:
+        """진행 상태 갱신 후 복사본 반환"""
+        with self._lock:
+            progress = self._items.get(document_id) or IngestionProgress(document_id)
+            for key, value in changes.items():
+                setattr(progress, key, value)
+            progress.updated_at = time.time()
+            self._items[document_id] = progress
+            return IngestionProgress(**asdict(progress))
+
+    def get(self, document_id: int) -> Optional[IngestionProgress]:
+        with self._lock:
+            progress = self._items.get(document_id)
+            return IngestionProgress(**asdict(progress)) if progress else None
+
+    def discard(self, document_id: int) -> None:
+        with self._lock:
+            self._items.pop(document_id, None)
+
+
+class RedisProgressTracker(ProgressTracker):
+    """Redis 에 진행 상태를 저장해 모든 API 워커가 같은 값을 보게 함
+
+    갱신은 수집 워커 프로세스 한 곳에서만 하므로 읽고-합치고-쓰기로 충분하다.
+    Redis 오류는 처리 자체를 막지 않도록 기록만 한다. 호출이 블로킹이므로
+    API 의 비동기 경로에서는 스레드 풀로 넘겨 호출한다.
+    """
+
+    def __init__(self, redis_url: str, ttl: int = PROGRESS_TTL):
+        import redis  # type: ignore
+
+        super().__init__()
+        self._client: Any = redis.Redis.from_url(redis_url)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(document_id: int) -> str:
+        return f"ingest:progress:{document_id}"
+
+    def update(self, document_id: int, **changes) -> IngestionProgress:
+        """진행 상태 갱신 후 복사본 반환"""
+        progress = self.get(document_id) or IngestionProgress(document_id)
+        for key, value in changes.items():
+            setattr(progress, key, value)
+        progress.updated_at = time.time()
+        try:
+            self._client.set(
+                self._key(document_id), json.dumps(progress.to_dict()), ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning("진행 상태 저장 실패: document_id=%s (%s)", document_id, e)
+        return progress
+
+    def get(self, document_id: int) -> Optional[IngestionProgress]:
+        try:
+            raw = self._client.get(self._key(document_id))
+        except Exception as e:
+            logger.warning("진행 상태 조회 실패: document_id=%s (%s)", document_id, e)
+            return None
+        return IngestionProgress(**json.loads(raw)) if raw else None
+
+    def discard(self, document_id: int) -> None:
+        try:
+            self._client.delete(self._key(document_id))
+        except Exception as e:
+            logger.warning("진행 상태 삭제 실패: document_id=%s (%s)", document_id, e)
+
+
+progress_tracker: ProgressTracker = (
+    RedisProgressTracker(settings.REDIS_URL)
+    if settings.REDIS_URL
+    else ProgressTracker()
+)
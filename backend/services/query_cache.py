@@ -0,0 +1,433 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Type, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+
+from app.config import settings
+from core.cache import LRUCache
+from core.metrics import CACHE_EVENTS
+from models.document import Document, DocumentChunk  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_INTERVAL = 0.05
+# 단일 비행을 이끌던 요청이 취소됐음을 기다리는 요청에 알리는 값
+_LEADER_CANCELLED = object()
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！]+$")
+# 카운터 이름 -> /metrics 의 rag_cache_events_total 이벤트 라벨
+_CACHE_EVENTS = {
+    "hits": "hit",
+    "misses": "miss",
+    "redis_hits": "redis_hit",
+    "coalesced": "coalesced",
+    "stores": "store",
+    "bypassed": "bypassed",
+}
+
+
+def normalize_query(query: str) -> str:
+    """대소문자·공백·끝 문장부호 차이를 없앤 캐시용 쿼리"""
+    normalized = unicodedata.normalize("NFKC", query).lower()
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return _TRAILING_PUNCTUATION.sub("", normalized)
+
+
+class CacheUnavailable(Exception):
+    """공유 캐시(Redis)를 사용할 수 없어 캐시를 우회해야 함"""
+
+
+class FileVersionStore:
+    """디렉터리 안의 사용자별 카운터 파일 (Redis 가 없을 때 프로세스 간 공유)
+
+    파일은 임시 파일을 쓴 뒤 교체하므로 읽는 쪽은 잠금 없이 완전한 값을
+    읽고, 증가는 잠금 파일로 직렬화한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, user_id: int) -> str:
+        return os.path.join(self.path, str(user_id))
+
+    def get(self, user_id: int) -> int:
+        try:
+            with open(self._file(user_id), encoding="ascii") as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def incr(self, user_id: int) -> int:
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            value = self.get(user_id) + 1
+            tmp_path = self._file(user_id) + ".tmp"
+            with open(tmp_path, "w", encoding="ascii") as f:
+                f.write(str(value))
+            os.replace(tmp_path, self._file(user_id))
+        return value
+
+
+class DocumentSetVersions:
+    """사용자별 문서 집합 버전
+
+    문서나 청크가 바뀔 때마다 버전을 올리고, 캐시 키에 버전을 넣어
+    이전 문서 집합으로 만든 결과가 다시 쓰이지 않게 한다. REDIS_URL 이
+    설정돼 있으면 Redis 카운터를, 아니면 ``version_dir`` 의 카운터 파일을
+    모든 프로세스(API 워커, 수집 워커)가 공유한다.
+
+    버전 조회나 갱신이 실패하면 ``CacheUnavailable`` 로 캐시를 우회한다.
+    갱신에 실패한 사용자는 다음 갱신이 성공할 때까지 이 프로세스에서 캐시를
+    쓰지 않는다 (다른 프로세스의 항목은 TTL 안에 만료된다).
+    """
+
+    def __init__(self, redis_url: Optional[str], version_dir: str):
+        self.redis_url = redis_url
+        self._files = FileVersionStore(version_dir)
+        self._sync_client: Any = None
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._unbumped: Set[int] = set()
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"docver:{user_id}"
+
+    def bump(self, user_id: int) -> None:
+        """사용자 문서 집합 버전 증가 (동기 코드용)"""
+        try:
+            if not self.redis_url:
+                self._files.incr(user_id)
+            else:
+                client = self._sync_client
+                if client is None:
+                    import redis  # type: ignore
+
+                    client = redis.Redis.from_url(self.redis_url)
+                    self._sync_client = client
+                client.incr(self._key(user_id))
+        except Exception as e:
+            self._bump_failed(user_id, e)
+        else:
+            self._unbumped.discard(user_id)
+
+    async def bump_async(self, user_id: int) -> None:
+        """사용자 문서 집합 버전 증가 (이벤트 루프용)"""
+        try:
+            if not self.redis_url:
+                await asyncio.to_thread(self._files.incr, user_id)
+            else:
+                await self.async_client().incr(self._key(user_id))
+        except Exception as e:
+            self._bump_failed(user_id, e)
+        else:
+            self._unbumped.discard(user_id)
+
+    def _bump_failed(self, user_id: int, error: Exception) -> None:
+        # 버전을 올리지 못하면 오래된 답변이 남을 수 있으므로 크게 알린다
+        logger.error("문서 집합 버전 갱신 실패: user_id=%s (%s)", user_id, error)
+        self._unbumped.add(user_id)
+
+    async def get(self, user_id: int) -> int:
+        """현재 버전 조회"""
+        if user_id in self._unbumped:
+            await self.bump_async(user_id)
+            if user_id in self._unbumped:
+                raise CacheUnavailable("문서 집합 버전을 갱신하지 못했습니다")
+        try:
+            if not self.redis_url:
+                return await asyncio.to_thread(self._files.get, user_id)
+            value = await self.async_client().get(self._key(user_id))
+        except Exception as e:
+            raise CacheUnavailable(str(e)) from e
+        return int(value or 0)
+
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import redis.asyncio as redis  # type: ignore
+
+            client = redis.from_url(self.redis_url)
+            self._async_clients[loop] = client
+        return client
+
+
+class QueryCache:
+    """검색·답변 결과 캐시 (단일 비행 포함)
+
+    키는 ``종류:사용자:문서집합버전:정규화쿼리+파라미터 해시`` 이다.
+    같은 키의 요청이 동시에 몰리면 워커 안에서는 하나의 Future 를
+    공유하고, 워커 사이에서는 Redis 잠금을 잡은 한 곳만 계산한다.
+    """
+
+    def __init__(
+        self,
+        versions: DocumentSetVersions,
+        ttl: int,
+        local_size: int,
+        lock_timeout: float,
+    ):
+        self.versions = versions
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.local: LRUCache[str, Tuple[float, Any]] = LRUCache(
+            local_size, name="query"
+        )
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "redis_hits": 0,
+            "coalesced": 0,
+            "stores": 0,
+            "bypassed": 0,
+        }
+        self._metrics = {
+            name: CACHE_EVENTS.labels("query", event)
+            for name, event in _CACHE_EVENTS.items()
+        }
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    def cache_key(
+        self,
+        kind: str,
+        user_id: int,
+        version: int,
+        query: str,
+        params: Optional[dict] = None,
+    ) -> str:
+        payload = json.dumps(
+            [normalize_query(query), params or {}], sort_keys=True, ensure_ascii=False
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"qc:{kind}:{user_id}:{version}:{digest}"
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        user_id: int,
+        query: str,
+        compute: Callable[[], Awaitable[Any]],
+        params: Optional[dict] = None,
+    ) -> Any:
+        """캐시된 결과를 반환하거나 한 번만 계산하여 저장
+
+        결과는 JSON 직렬화 가능한 값이어야 한다.
+        """
+        try:
+            version = await self.versions.get(user_id)
+        except CacheUnavailable:
+            self._count("bypassed")
+            return await compute()
+        key = self.cache_key(kind, user_id, version, query, params)
+
+        cached = self._get_local(key)
+        if cached is not None:
+            self._count("hits")
+            return cached
+
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._inflight.get(flight_key)
+        if flight is not None:
+            self._count("coalesced")
+        while flight is not None:
+            result = await asyncio.shield(flight)
+            if result is not _LEADER_CANCELLED:
+                return result
+            # 계산하던 요청이 취소되면 기다리던 요청 중 먼저 깨어난 쪽이
+            # 자기 compute 로 이어서 계산하고 나머지는 그 결과를 기다린다
+            flight = self._inflight.get(flight_key)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = flight
+        try:
+            result = await self._load_or_compute(key, compute)
+            flight.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            flight.set_result(_LEADER_CANCELLED)
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # 기다리는 쪽이 없으면 "never retrieved" 경고가 남지 않도록 소비
+            flight.exception()
+            raise
+        finally:
+            del self._inflight[flight_key]
+
+    async def _load_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        client = self._redis()
+        if client is None:
+            self._count("misses")
+            result = await compute()
+            self._set_local(key, result)
+            self._count("stores")
+            return result
+
+        try:
+            cached = await self._get_redis(client, key)
+            if cached is not None:
+                return cached
+            locked = await client.set(
+                f"lock:{key}", 1, nx=True, px=int(self.lock_timeout * 1000)
+            )
+            if not locked:
+                cached = await self._wait_for_leader(client, key)
+                if cached is not None:
+                    return cached
+        except Exception as e:
+            logger.warning("질의 캐시 Redis 오류, 캐시 우회: %s", e)
+            self._count("bypassed")
+            return await compute()
+
+        self._count("misses")
+        try:
+            result = await compute()
+            self._set_local(key, result)
+            await self._store_redis(client, key, result)
+        finally:
+            if locked:
+                await self._release_lock(client, key)
+        return result
+
+    async def _store_redis(self, client, key: str, result: Any) -> None:
+        try:
+            await client.set(key, json.dumps(result, ensure_ascii=False), ex=self.ttl)
+            self._count("stores")
+        except Exception as e:
+            logger.warning("질의 캐시 저장 실패: %s", e)
+
+    async def _release_lock(self, client, key: str) -> None:
+        try:
+            await client.delete(f"lock:{key}")
+        except Exception as e:
+            logger.warning("질의 캐시 잠금 해제 실패: %s", e)
+
+    async def _get_redis(self, client, key: str) -> Any:
+        raw = await client.get(key)
+        if raw is None:
+            return None
+        result = json.loads(raw)
+        self._count("redis_hits")
+        self._set_local(key, result)
+        return result
+
+    async def _wait_for_leader(self, client, key: str) -> Any:
+        """다른 워커가 계산 중이면 결과가 저장될 때까지 잠시 대기"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            cached = await self._get_redis(client, key)
+            if cached is not None:
+                self._count("coalesced")
+                return cached
+            if not await client.exists(f"lock:{key}"):
+                return None
+        return None
+
+    def _redis(self):
+        if not self.versions.redis_url:
+            return None
+        return self.versions.async_client()
+
+    def _get_local(self, key: str) -> Any:
+        entry = self.local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.local.pop(key)
+            return None
+        return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        self.local.set(key, (time.monotonic() + self.ttl, value))
+
+    def _count(self, name: str) -> None:
+        self.counters[name] += 1
+        self._metrics[name].inc()
+
+    def stats(self) -> Dict[str, int]:
+        """적중/미스/합치기/축출 카운터"""
+        local = self.local.stats()
+        return {
+            **self.counters,
+            "local_size": local["size"],
+            "evictions": local["evictions"],
+        }
+
+
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """flush 된 Document/DocumentChunk 의 소유자를 세션에 기록"""
+    users: Set[int] = session.info.setdefault("docset_changed_users", set())
+    document_ids: Set[int] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Document) and obj.user_id is not None:
+            users.add(obj.user_id)
+        elif isinstance(obj, DocumentChunk) and obj.document_id is not None:
+            document_ids.add(obj.document_id)
+    if document_ids:
+        rows = session.connection().execute(
+            select(Document.user_id).where(Document.id.in_(document_ids))
+        )
+        users.update(row[0] for row in rows)
+
+
+async def _bump_users_async(users: Set[int]) -> None:
+    for user_id in users:
+        await document_set_versions.bump_async(user_id)
+
+
+def _bump_changed_users(session: Session) -> None:
+    users: Set[int] = session.info.pop("docset_changed_users", set())
+    if not users:
+        return
+    bump = _bump_users_async(users)
+    try:
+        # AsyncSession 의 커밋은 greenlet 안에서 실행되므로 이벤트 루프를
+        # 막지 않고 비동기 클라이언트로 갱신을 기다린다
+        await_only(bump)
+    except MissingGreenlet:
+        bump.close()
+        for user_id in users:
+            document_set_versions.bump(user_id)
+
+
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("docset_changed_users", None)
+
+
+def install_version_listeners(target: Union[sessionmaker, Type[Session]]) -> None:
+    """ORM 으로 문서/청크가 바뀌면 커밋 시 사용자 버전을 올리도록 등록
+
+    Core ``insert``/``delete`` 일괄 쓰기는 flush 를 거치지 않으므로
+    해당 코드에서 ``document_set_versions.bump`` 를 직접 호출한다.
+    """
+    event.listen(target, "after_flush", _collect_changed_users)
+    event.listen(target, "after_commit", _bump_changed_users)
+    event.listen(target, "after_rollback", _discard_changed_users)
+
+
+document_set_versions = DocumentSetVersions(
+    settings.REDIS_URL, settings.DOCUMENT_VERSION_DIR
+)
+
+query_cache = QueryCache(
+    document_set_versions,
+    ttl=settings.QUERY_CACHE_TTL,
+    local_size=settings.QUERY_CACHE_LOCAL_SIZE,
+    lock_timeout=settings.QUERY_CACHE_LOCK_TIMEOUT,
+)
@@ -0,0 +1,146 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import anyio
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from core.metrics import stage_timer
+from models.document import Document, DocumentChunk  # type: ignore
+from services.embedding import get_embedding_service
+from services.lexical_index import get_lexical_index
+from services.vector_store import SearchHit, get_vector_store
+
+
+@dataclass
+class FusedHit:
+    """RRF 로 합친 검색 결과 (검색기별 1부터 시작하는 순위 포함)"""
+
+    chunk_id: int
+    document_id: int
+    score: float
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+
+def reciprocal_rank_fusion(
+    rankings: Mapping[str, Sequence[SearchHit]],
+    k: int = 60,
+    weights: Optional[Mapping[str, float]] = None,
+) -> List[FusedHit]:
+    """여러 검색기의 순위를 ``Σ weight / (k + rank)`` 로 합침
+
+    점수 척도가 다른 BM25 와 코사인 유사도를 정규화 없이 결합할 수 있다.
+    """
+    fused: Dict[int, FusedHit] = {}
+    for name, hits in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit.chunk_id)
+            if entry is None:
+                entry = fused[hit.chunk_id] = FusedHit(
+                    hit.chunk_id, hit.document_id, 0.0
+                )
+            entry.score += weight / (k + rank)
+            entry.ranks[name] = rank
+    return sorted(fused.values(), key=lambda hit: (-hit.score, hit.chunk_id))
+
+
+def _vector_hits(
+    embedding: np.ndarray,
+    user_id: int,
+    candidates: int,
+    document_ids: Optional[Sequence[int]],
+) -> List[SearchHit]:
+    try:
+        store = get_vector_store()
+    except (NotImplementedError, FileNotFoundError):
+        # 외부 벡터 DB 이거나 수집 워커가 아직 인덱스를 만들지 않은 경우
+        return []
+    store.reload_if_stale()
+    return store.search(
+        embedding[None, :], candidates, user_ids=user_id, document_ids=document_ids
+    )[0]
+
+
+def _lexical_hits(
+    query: str,
+    user_id: int,
+    candidates: int,
+    document_ids: Optional[Sequence[int]],
+) -> List[SearchHit]:
+    try:
+        index = get_lexical_index()
+    except FileNotFoundError:
+        # 수집 워커가 아직 역색인을 만들지 않은 경우
+        return []
+    index.reload_if_stale()
+    return index.search(query, candidates, user_id=user_id, document_ids=document_ids)
+
+
+@stage_timer("retrieval")
+async def hybrid_search(
+    db: AsyncSession,
+    query: str,
+    user_id: int,
+    k: int = 5,
+    document_ids: Optional[Sequence[int]] = None,
+) -> List[dict]:
+    """BM25 + 벡터 하이브리드 검색
+
+    두 검색기에서 사용자 문서로 한정한 후보를 각각 뽑아 RRF 로 합치고,
+    상위 청크의 본문과 문서 제목을 한 번의 쿼리로 채운다. 색인에 남아
+    있지만 DB 에서 이미 지워진 청크는 여기서 걸러진다.
+    """
+    candidates = max(settings.HYBRID_CANDIDATES, k)
+    embedding = await get_embedding_service().embed_query(query)
+    vector_hits, lexical_hits = await asyncio.gather(
+        anyio.to_thread.run_sync(
+            _vector_hits, embedding, user_id, candidates, document_ids
+        ),
+        anyio.to_thread.run_sync(
+            _lexical_hits, query, user_id, candidates, document_ids
+        ),
+    )
+
+    fused = reciprocal_rank_fusion(
+        {"vector": vector_hits, "lexical": lexical_hits}, k=settings.HYBRID_RRF_K
+    )[: k * 2]
+    if not fused:
+        return []
+    rows = await db.execute(
+        select(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.content,
+            DocumentChunk.page_number,
+            Document.title,
+        )
+        .join(Document, Document.id == DocumentChunk.document_id)
+        .where(DocumentChunk.id.in_([hit.chunk_id for hit in fused]))
+        .where(Document.user_id == user_id)
+    )
+    chunks = {row.id: row for row in rows}
+
+    results = []
+    for hit in fused:
+        row = chunks.get(hit.chunk_id)
+        if row is None:
+            continue
+        results.append(
+            {
+                "chunk_id": row.id,
+                "document_id": row.document_id,
+                "document_title": row.title,
+                "chunk_content": row.content,
+                "page_number": row.page_number,
+                "score": hit.score,
+                "vector_rank": hit.ranks.get("vector"),
+                "lexical_rank": hit.ranks.get("lexical"),
+            }
+        )
+        if len(results) == k:
+            break
+    return results
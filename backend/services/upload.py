@@ -0,0 +1,329 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from multipart.multipart import (  # type: ignore
+    MultipartParser,
+    parse_options_header,
+)
+
+from app.config import settings
+
+
+class UploadError(ValueError):
+    """업로드 요청 오류"""
+
+
+class FileTooLargeError(UploadError):
+    """최대 파일 크기 초과"""
+
+
+@dataclass
+class StoredUpload:
+    """저장이 끝난 업로드 파일 정보"""
+
+    location: str
+    filename: str
+    extension: str
+    size: int
+    sha256: str
+
+
+def s3_client():
+    """설정 기반 S3 클라이언트 생성"""
+    import boto3  # type: ignore
+
+    return boto3.client(
+        "s3",
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    )
+
+
+class UploadSink(ABC):
+    """업로드 바이트를 고정 크기 단위로 내보내는 저장소"""
+
+    def __init__(self, extension: str, part_size: int):
+        self.extension = extension
+        self.part_size = part_size
+        self._buffer = bytearray()
+
+    async def write(self, data: bytes) -> None:
+        """버퍼가 part_size 이상 차면 한 파트씩 기록"""
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            await self._write_part(part)
+
+    async def commit(self) -> str:
+        """남은 버퍼를 기록하고 최종 위치 반환"""
+        if self._buffer:
+            await self._write_part(bytes(self._buffer))
+            self._buffer.clear()
+        return await self._finalize()
+
+    @abstractmethod
+    async def _write_part(self, part: bytes) -> None:
+        """파트 하나 기록"""
+
+    @abstractmethod
+    async def _finalize(self) -> str:
+        """업로드 완료 처리"""
+
+    @abstractmethod
+    async def abort(self) -> None:
+        """부분 업로드 정리"""
+
+
+class LocalUploadSink(UploadSink):
+    """UPLOAD_DIR 로컬 디스크 저장소"""
+
+    def __init__(self, extension: str, upload_dir: Optional[str] = None):
+        super().__init__(extension, settings.UPLOAD_CHUNK_SIZE)
+        self.upload_dir = upload_dir or settings.UPLOAD_DIR
+        os.makedirs(self.upload_dir, exist_ok=True)
+        name = uuid.uuid4().hex
+        self._tmp_path = os.path.join(self.upload_dir, f".{name}.part")
+        self._path = os.path.join(self.upload_dir, name + extension)
+        self._file = open(self._tmp_path, "wb")
+
+    async def _write_part(self, part: bytes) -> None:
+        await asyncio.to_thread(self._file.write, part)
+
+    async def _finalize(self) -> str:
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+        return self._path
+
+    async def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class S3UploadSink(UploadSink):
+    """S3 멀티파트 업로드 저장소"""
+
+    def __init__(self, extension: str, bucket: str):
+        super().__init__(extension, settings.S3_MULTIPART_PART_SIZE)
+        self.bucket = bucket
+        self.key = f"{settings.UPLOAD_DIR}/{uuid.uuid4().hex}{extension}"
+        self._client = s3_client()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict] = []
+
+    async def _write_part(self, part: bytes) -> None:
+        if self._upload_id is None:
+            response = await asyncio.to_thread(
+                self._client.create_multipart_upload,
+                Bucket=self.bucket,
+                Key=self.key,
+            )
+            self._upload_id = response["UploadId"]
+        number = len(self._parts) + 1
+        response = await asyncio.to_thread(
+            self._client.upload_part,
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=part,
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+    async def _finalize(self) -> str:
+        if self._upload_id is None:
+            # 빈 파일은 멀티파트 없이 바로 저장
+            await asyncio.to_thread(
+                self._client.put_object, Bucket=self.bucket, Key=self.key, Body=b""
+            )
+        else:
+            await asyncio.to_thread(
+                self._client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        return f"s3://{self.bucket}/{self.key}"
+
+    async def abort(self) -> None:
+        if self._upload_id is not None:
+            await asyncio.to_thread(
+                self._client.abort_multipart_upload,
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+            )
+
+
+def create_sink(extension: str) -> UploadSink:
+    """설정에 맞는 업로드 저장소 생성"""
+    if settings.S3_BUCKET_NAME:
+        return S3UploadSink(extension, settings.S3_BUCKET_NAME)
+    return LocalUploadSink(extension)
+
+
+def validate_extension(filename: str) -> str:
+    """허용된 확장자인지 검사 후 소문자 확장자 반환"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in settings.ALLOWED_EXTENSIONS:
+        raise UploadError(f"지원하지 않는 파일 형식입니다: {extension or filename}")
+    return extension
+
+
+class _MultipartFileReceiver:
+    """multipart 본문을 파싱하며 파일 파트를 곧바로 저장소로 흘려보냄
+
+    파서 콜백은 동기 함수이므로 파일 데이터는 요청 청크 하나 분량만
+    모아 두었다가 ``feed`` 에서 비동기로 기록한다. 저장소 생성(파일 열기,
+    S3 클라이언트 생성)도 블로킹이므로 ``feed`` 에서 스레드로 넘긴다.
+    """
+
+    def __init__(self, boundary: bytes, max_size: int):
+        self.max_size = max_size
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.sink: Optional[UploadSink] = None
+        self._extension: Optional[str] = None
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        self._pending: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._part_name: Optional[str] = None
+        self._part_is_file = False
+        self._field_value = bytearray()
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._field_value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        disposition = self._headers.get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        self._part_name = options.get(b"name", b"").decode("utf-8")
+        filename = options.get(b"filename")
+        self._part_is_file = filename is not None
+        if not self._part_is_file:
+            return
+        if self.filename is not None:
+            raise UploadError("파일은 한 번에 하나만 업로드할 수 있습니다.")
+        self.filename = os.path.basename(filename.decode("utf-8"))
+        self._extension = validate_extension(self.filename)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part_is_file:
+            self._pending.append(data[start:end])
+            return
+        self._field_value += data[start:end]
+        if len(self._field_value) > settings.UPLOAD_FIELD_MAX_SIZE:
+            raise UploadError("폼 필드 값이 너무 큽니다.")
+
+    def _on_part_end(self) -> None:
+        if not self._part_is_file and self._part_name:
+            self.fields[self._part_name] = self._field_value.decode("utf-8")
+
+    async def feed(self, chunk: bytes) -> None:
+        """요청 청크 하나를 파싱하고 파일 데이터를 기록"""
+        self._parser.write(chunk)
+        if self.sink is None and self._extension is not None:
+            self.sink = await asyncio.to_thread(create_sink, self._extension)
+        for data in self._pending:
+            self.size += len(data)
+            if self.size > self.max_size:
+                raise FileTooLargeError(
+                    f"파일 크기가 최대 허용 크기({self.max_size} bytes)를 초과했습니다."
+                )
+            self._hasher.update(data)
+            await self.sink.write(data)  # type: ignore[union-attr]
+        self._pending.clear()
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+
+async def receive_upload(
+    content_type: str,
+    body: AsyncIterator[bytes],
+    max_size: Optional[int] = None,
+) -> Tuple[StoredUpload, Dict[str, str]]:
+    """multipart 요청 본문을 스트리밍으로 저장
+
+    파일 전체를 메모리에 올리지 않고 청크 단위로 크기 제한 검사,
+    SHA-256 해시 계산, 저장소 기록을 동시에 수행한다.
+    """
+    mime_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise UploadError("multipart/form-data 요청이 필요합니다.")
+
+    receiver = _MultipartFileReceiver(boundary, max_size or settings.MAX_FILE_SIZE)
+    try:
+        async for chunk in body:
+            await receiver.feed(chunk)
+        if receiver.sink is None or receiver.filename is None:
+            raise UploadError("업로드할 파일이 없습니다.")
+        location = await receiver.sink.commit()
+    except BaseException:
+        if receiver.sink is not None:
+            await receiver.sink.abort()
+        raise
+
+    stored = StoredUpload(
+        location=location,
+        filename=receiver.filename,
+        extension=receiver.sink.extension,
+        size=receiver.size,
+        sha256=receiver.sha256,
+    )
+    return stored, receiver.fields
+
+
+def delete_stored_file_sync(location: str) -> None:
+    """저장된 업로드 파일 삭제 (로컬 경로 또는 s3:// 위치)"""
+    if location.startswith("s3://"):
+        bucket, key = location[len("s3://") :].split("/", 1)
+        s3_client().delete_object(Bucket=bucket, Key=key)
+    elif os.path.exists(location):
+        os.remove(location)
+
+
+async def delete_stored_file(location: str) -> None:
+    await asyncio.to_thread(delete_stored_file_sync, location)
+
+
+async def discard_upload(stored: StoredUpload) -> None:
+    """중복 등으로 사용하지 않게 된 업로드 파일 삭제"""
+    await delete_stored_file(stored.location)
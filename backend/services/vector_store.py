@@ -0,0 +1,170 @@
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from models.document import Document, DocumentChunk  # type: ignore
+from services.embedding_store import load_shard_matrix
+
+if TYPE_CHECKING:
+    from services.local_vector_index import LocalVectorStore
+
+DEFAULT_SHARD_SIZE = 50_000
+
+# id 목록 인자 (리스트 또는 정수 배열)
+IdArray = Union[Sequence[int], np.ndarray]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """벡터 검색 결과"""
+
+    chunk_id: int
+    document_id: int
+    score: float
+
+
+class VectorStore(ABC):
+    """벡터 저장소 인터페이스"""
+
+    @abstractmethod
+    def add(
+        self,
+        chunk_ids: IdArray,
+        document_ids: IdArray,
+        user_ids: IdArray,
+        vectors: np.ndarray,
+    ) -> None:
+        """청크 벡터 추가"""
+
+    @abstractmethod
+    def delete_documents(self, document_ids: IdArray) -> None:
+        """문서에 속한 모든 벡터 삭제"""
+
+    @abstractmethod
+    def delete_chunks(self, chunk_ids: IdArray) -> None:
+        """개별 청크 벡터 삭제"""
+
+    @abstractmethod
+    def document_chunk_ids(self, document_id: int) -> np.ndarray:
+        """문서의 색인된 청크 id"""
+
+    @abstractmethod
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        user_ids: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        document_ids: Optional[IdArray] = None,
+    ) -> List[List[SearchHit]]:
+        """쿼리 행렬의 각 행에 대한 top-k 검색
+
+        사용자·문서 필터는 top-k 를 고르기 전에 적용한다.
+        """
+
+    def flush(self) -> None:
+        """변경 사항을 영속화 (필요한 백엔드만 구현)"""
+
+    def reload_if_stale(self) -> bool:
+        """다른 프로세스의 변경 사항 반영 (필요한 백엔드만 구현)"""
+        return False
+
+
+def build_local_index(
+    db: Session,
+    path: str,
+    nlist: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> "LocalVectorStore":
+    """DB 의 모든 청크 임베딩으로 로컬 인덱스를 새로 빌드"""
+    from services.local_vector_index import LocalVectorStore
+
+    max_id = db.execute(select(func.max(DocumentChunk.id))).scalar() or 0
+    matrices: List[np.ndarray] = []
+    chunk_ids: List[np.ndarray] = []
+    document_ids: List[np.ndarray] = []
+    user_ids: List[np.ndarray] = []
+    for start in range(0, max_id + 1, shard_size):
+        matrix, ids = load_shard_matrix(db, start, start + shard_size)
+        if len(ids) == 0:
+            continue
+        owners = db.execute(
+            select(DocumentChunk.id, DocumentChunk.document_id, Document.user_id)
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .where(DocumentChunk.id >= start)
+            .where(DocumentChunk.id < start + shard_size)
+            .where(DocumentChunk.embedding.is_not(None))
+            .order_by(DocumentChunk.id)
+        ).all()
+        matrices.append(matrix)
+        chunk_ids.append(ids)
+        document_ids.append(np.asarray([row[1] for row in owners], np.int64))
+        user_ids.append(np.asarray([row[2] for row in owners], np.int64))
+
+    if not matrices:
+        vectors = np.empty((0, settings.EMBEDDING_DIM), dtype=np.float32)
+        empty = np.empty(0, dtype=np.int64)
+        return LocalVectorStore.build(
+            path,
+            empty,
+            empty,
+            empty,
+            vectors,
+            nprobe=settings.VECTOR_INDEX_NPROBE,
+        )
+    return LocalVectorStore.build(
+        path,
+        np.concatenate(chunk_ids),
+        np.concatenate(document_ids),
+        np.concatenate(user_ids),
+        np.concatenate(matrices),
+        nlist,
+        nprobe=settings.VECTOR_INDEX_NPROBE,
+    )
+
+
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def _open_store() -> VectorStore:
+    if settings.VECTOR_DB_TYPE != "local":
+        raise NotImplementedError(
+            f"지원하지 않는 벡터 DB 타입입니다: {settings.VECTOR_DB_TYPE}"
+        )
+    from services.local_vector_index import LocalVectorStore
+
+    return LocalVectorStore(
+        settings.VECTOR_INDEX_DIR, nprobe=settings.VECTOR_INDEX_NPROBE
+    )
+
+
+def get_vector_store() -> VectorStore:
+    """설정(VECTOR_DB_TYPE)에 맞는 벡터 저장소 반환 (읽기용)
+
+    인덱스는 수집 워커가 ``ensure_vector_index`` 로 만든다. 아직 없으면
+    FileNotFoundError 를 낸다.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _open_store()
+    return _store
+
+
+def ensure_vector_index(db: Session) -> VectorStore:
+    """벡터 저장소를 열고, 인덱스가 없으면 DB 임베딩으로 빌드 (작성자 전용)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = _open_store()
+            except FileNotFoundError:
+                _store = build_local_index(db, settings.VECTOR_INDEX_DIR)
+    return _store
@@ -0,0 +1,53 @@
+"""테스트 공통 설정
+
+PostgreSQL·Redis·OpenAI 없이 돌도록 앱 모듈을 import 하기 전에 설정을
+임시 SQLite, 프로세스 내 큐/캐시, 로컬 해시 임베딩으로 바꾼다.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="rag-tests-")
+
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{_TMP_DIR}/test.db",
+        "REDIS_URL": "",
+        "EMBEDDING_PROVIDER": "local",
+        "EMBEDDING_DIM": "64",
+        "VECTOR_DB_TYPE": "local",
+        "VECTOR_INDEX_DIR": os.path.join(_TMP_DIR, "vector_index"),
+        "LEXICAL_INDEX_DIR": os.path.join(_TMP_DIR, "lexical_index"),
+        "UPLOAD_DIR": os.path.join(_TMP_DIR, "uploads"),
+        "DOCUMENT_VERSION_DIR": os.path.join(_TMP_DIR, "document_versions"),
+    }
+)
+
+
+@pytest.fixture
+def db():
+    """테이블을 만든 동기 세션 (테스트가 끝나면 행을 모두 지움)"""
+    from app.database import SessionLocal, engine
+    from models.base import Base  # type: ignore
+    from models.document import Document, DocumentChunk  # type: ignore
+    from models.user import User  # type: ignore
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        yield session
+        session.rollback()
+        for model in (DocumentChunk, Document, User):
+            session.execute(model.__table__.delete())
+        session.commit()
+
+
+@pytest.fixture
+def user(db):
+    from models.user import User  # type: ignore
+
+    user = User(email="u@example.com", username="u", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
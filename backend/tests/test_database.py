@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_database_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql://u:p@db/rag", "postgresql+asyncpg://u:p@db/rag"),
+        ("postgresql+psycopg2://u:p@db/rag", "postgresql+asyncpg://u:p@db/rag"),
+        ("postgresql+asyncpg://u:p@db/rag", "postgresql+asyncpg://u:p@db/rag"),
+    ],
+)
+def test_async_database_url_maps_sync_drivers(url, expected):
+    assert async_database_url(url) == expected
+
+
+@pytest.mark.asyncio
+async def test_async_session_runs_on_aiosqlite_with_foreign_keys(db, user):
+    from app.database import async_engine, get_async_db
+    from models.document import Document, DocumentChunk  # type: ignore
+
+    assert async_engine.dialect.driver == "aiosqlite"
+
+    document = Document(
+        title="t",
+        filename="t.txt",
+        file_path="t.txt",
+        file_size=1,
+        file_type="txt",
+        user_id=user.id,
+    )
+    db.add(document)
+    db.flush()
+    db.add(DocumentChunk(document_id=document.id, chunk_index=0, content="본문"))
+    db.commit()
+
+    sessions = get_async_db()
+    session = await sessions.__anext__()
+    try:
+        await session.delete(await session.get(Document, document.id))
+        await session.commit()
+        # PRAGMA foreign_keys 가 비동기 엔진에도 적용돼 청크가 함께 지워진다
+        remaining = await session.scalar(
+            select(func.count()).select_from(DocumentChunk)
+        )
+        assert remaining == 0
+    finally:
+        await sessions.aclose()
@@ -0,0 +1,66 @@
+import pytest
+
+from services.document_queries import InvalidCursor, encode_cursor, fetch_chunks
+
+
+def _document_with_chunks(db, user, indexes):
+    from models.document import Document, DocumentChunk  # type: ignore
+
+    document = Document(
+        title="t",
+        filename="t.txt",
+        file_path="t.txt",
+        file_size=1,
+        file_type="txt",
+        user_id=user.id,
+    )
+    db.add(document)
+    db.flush()
+    for chunk_index in indexes:
+        db.add(
+            DocumentChunk(
+                document_id=document.id,
+                chunk_index=chunk_index,
+                content=f"청크 {chunk_index}",
+            )
+        )
+    db.commit()
+    return document
+
+
+@pytest.mark.asyncio
+async def test_fetch_chunks_pages_through_duplicate_indexes(db, user):
+    from app.database import AsyncSessionLocal
+
+    # 페이지 경계가 같은 chunk_index 묶음 한가운데에 걸리도록 중복을 둔다
+    indexes = [0, 0, 1, 1, 1, 1, 2, 3, 3]
+    document = _document_with_chunks(db, user, indexes)
+
+    seen, cursor, pages = [], None, 0
+    async with AsyncSessionLocal() as session:
+        while True:
+            chunks, cursor = await fetch_chunks(
+                session, document.id, cursor, limit=2, include_content=False
+            )
+            seen.extend((chunk.chunk_index, chunk.id) for chunk in chunks)
+            pages += 1
+            if cursor is None:
+                break
+
+    assert pages == 5
+    assert len(seen) == len(indexes)
+    assert seen == sorted(seen)
+    assert sorted(index for index, _ in seen) == indexes
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cursor", ["!!", encode_cursor(1), encode_cursor("a", 1), encode_cursor(1, None)]
+)
+async def test_fetch_chunks_rejects_malformed_cursor(db, user, cursor):
+    from app.database import AsyncSessionLocal
+
+    document = _document_with_chunks(db, user, [0])
+    async with AsyncSessionLocal() as session:
+        with pytest.raises(InvalidCursor):
+            await fetch_chunks(session, document.id, cursor)
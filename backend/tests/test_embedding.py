@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from services import embedding
+from services.embedding import EmbeddingCache, EmbeddingProvider, EmbeddingService
+
+
+class _GatedProvider(EmbeddingProvider):
+    """``release`` 전까지 응답하지 않는 테스트용 제공자"""
+
+    name = "gated"
+    dim = 4
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def embed(self, texts):
+        self.calls += 1
+        await self.release.wait()
+        return np.ones((len(texts), self.dim), dtype=np.float32)
+
+
+def _service(provider: EmbeddingProvider) -> EmbeddingService:
+    return EmbeddingService(provider, EmbeddingCache("test", 100, 60), max_wait=0)
+
+
+async def _stop_collector(service: EmbeddingService) -> None:
+    worker = service._states[asyncio.get_running_loop()].worker
+    assert worker is not None
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request():
+    provider = _GatedProvider()
+    service = _service(provider)
+    first = asyncio.create_task(service.embed_texts(["같은 문장"]))
+    second = asyncio.create_task(service.embed_texts(["같은 문장"]))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    provider.release.set()
+
+    assert (await second).shape == (1, 4)
+    assert first.cancelled()
+    assert provider.calls == 1
+    await _stop_collector(service)
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_batch_sizes_are_exported_to_prometheus():
+    from prometheus_client import REGISTRY
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    def events():
+        return {
+            event: sample("rag_cache_events_total", cache="embedding", event=event)
+            for event in ("hit", "miss")
+        }
+
+    provider = _GatedProvider()
+    provider.release.set()
+    service = _service(provider)
+    before = events()
+    batches = sample("rag_embedding_batch_size_count")
+    texts = sample("rag_embedding_batch_size_sum")
+
+    await service.embed_texts(["가", "나", "가"])
+    await service.embed_texts(["가", "다"])
+
+    after = events()
+    assert after["miss"] - before["miss"] == 3
+    assert after["hit"] - before["hit"] == 1
+    # max_wait=0 이라 첫 호출의 두 텍스트가 한 배치로 묶이지 않을 수 있다
+    assert 2 <= sample("rag_embedding_batch_size_count") - batches <= 3
+    assert sample("rag_embedding_batch_size_sum") - texts == 3
+    await _stop_collector(service)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_tasks_are_tracked_until_done():
+    provider = _GatedProvider()
+    service = _service(provider)
+    pending = asyncio.create_task(service.embed_texts(["a"]))
+    await asyncio.sleep(0.01)
+
+    state = service._states[asyncio.get_running_loop()]
+    assert len(state.dispatches) == 1
+    provider.release.set()
+    await pending
+    await asyncio.sleep(0)
+    assert not state.dispatches
+    await _stop_collector(service)
+
+
+def test_embed_texts_sync_reuses_one_loop(monkeypatch):
+    provider = _GatedProvider()
+    service = _service(provider)
+    monkeypatch.setattr(embedding, "_service", service)
+
+    def run(text: str) -> None:
+        provider.release.set()
+        embedding.embed_texts_sync([text])
+
+    for text in ("하나", "둘"):
+        thread = threading.Thread(target=run, args=(text,))
+        thread.start()
+        thread.join(5)
+    assert provider.calls == 2
+    assert len(service._states) == 1
+    loop = embedding._background_loop()
+    asyncio.run_coroutine_threadsafe(_stop_collector(service), loop).result(5)
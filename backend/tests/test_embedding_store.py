@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+from sqlalchemy import select
+
+from core.vectors import VectorDType
+from models.document import Document, DocumentChunk  # type: ignore
+from services.embedding_store import load_chunk_matrix, migrate_json_embeddings
+
+
+def _legacy_chunks(db, user, vectors):
+    document = Document(
+        title="legacy",
+        filename="legacy.txt",
+        file_path="legacy.txt",
+        file_size=1,
+        file_type="txt",
+        user_id=user.id,
+        is_processed=True,
+    )
+    db.add(document)
+    db.commit()
+    chunks = [
+        DocumentChunk(
+            document_id=document.id,
+            chunk_index=i,
+            content=f"청크 {i}",
+            embedding_vector=json.dumps(vector.tolist()),
+        )
+        for i, vector in enumerate(vectors)
+    ]
+    db.add_all(chunks)
+    db.commit()
+    return [chunk.id for chunk in chunks]
+
+
+def test_migrate_json_embeddings_converts_in_batches(db, user):
+    vectors = np.random.default_rng(1).standard_normal((5, 8)).astype(np.float32)
+    ids = _legacy_chunks(db, user, vectors)
+
+    assert migrate_json_embeddings(db, VectorDType.FLOAT16, batch_size=2) == 5
+
+    matrix, loaded = load_chunk_matrix(db, ids)
+    assert loaded.tolist() == ids
+    np.testing.assert_allclose(matrix, vectors, atol=1e-2)
+    rows = db.execute(
+        select(DocumentChunk.embedding_vector, DocumentChunk.embedding_dtype)
+    ).all()
+    assert rows == [(None, "float16")] * 5
+    # 이미 변환한 행은 다시 건드리지 않는다
+    assert migrate_json_embeddings(db, VectorDType.FLOAT16) == 0
+
+
+def test_migrate_json_embeddings_resumes_after_partial_run(db, user):
+    vectors = np.eye(4, dtype=np.float32)
+    ids = _legacy_chunks(db, user, vectors)
+    migrate_json_embeddings(db, batch_size=3)
+    # 중단된 상황을 흉내 내어 마지막 행을 미변환 상태로 되돌림
+    chunk = db.get(DocumentChunk, ids[-1])
+    chunk.embedding = None
+    chunk.embedding_vector = json.dumps(vectors[-1].tolist())
+    db.commit()
+
+    assert migrate_json_embeddings(db, batch_size=3) == 1
+    matrix, _ = load_chunk_matrix(db, ids)
+    np.testing.assert_array_equal(matrix, vectors)
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+import subprocess
+import sys
+
+from sqlalchemy import select, update
+
+from models.document import Document, DocumentChunk  # type: ignore
+from services.ingestion import chunk_hash, release_stale_files, write_chunks
+from services.progress import ProgressTracker
+
+VOCAB = "펌프 임펠러 교체 주기는 6개월이다. 베어링 윤활 점검 밸브 압력 확인".split()
+
+
+def _document(db, user, tmp_path, text: str) -> Document:
+    document = Document(
+        title="manual",
+        filename="manual.txt",
+        file_path=_write(tmp_path / "v1.txt", text),
+        file_size=len(text),
+        file_type="txt",
+        user_id=user.id,
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def _write(path, text: str) -> str:
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _chunks(db, document_id):
+    return db.execute(
+        select(DocumentChunk.id, DocumentChunk.chunk_index, DocumentChunk.content)
+        .where(DocumentChunk.document_id == document_id)
+        .order_by(DocumentChunk.chunk_index)
+    ).all()
+
+
+def test_reupload_embeds_only_changed_chunks(db, user, tmp_path):
+    rng = random.Random(7)
+    v1 = " ".join(rng.choice(VOCAB) for _ in range(3000))
+    cut = v1.index(" ", len(v1) // 2)
+    v2 = v1[:cut] + " 개정: 부품번호 ZX-9001 신규 임펠러 적용" + v1[cut:]
+    document = _document(db, user, tmp_path, v1)
+
+    first = write_chunks(db, document, ProgressTracker())
+    before = {row.content: row.id for row in _chunks(db, document.id)}
+    assert first.embedded_chunks == first.total_chunks > 10
+
+    document.file_path = _write(tmp_path / "v2.txt", v2)
+    db.commit()
+    second = write_chunks(db, document, ProgressTracker())
+    after = _chunks(db, document.id)
+
+    assert second.total_chunks == len(after)
+    assert second.reused_chunks + second.embedded_chunks == second.total_chunks
+    assert second.embedded_chunks <= 3
+    assert [row.chunk_index for row in after] == list(range(len(after)))
+    assert any("ZX-9001" in row.content for row in after)
+    # 재사용한 청크는 행(과 임베딩)을 그대로 쓴다
+    reused = [row for row in after if row.content in before]
+    assert len(reused) == second.reused_chunks
+    assert all(before[row.content] == row.id for row in reused)
+
+
+def test_backfills_missing_hashes_in_batches(db, user, tmp_path):
+    text = " ".join(VOCAB * 200)
+    document = _document(db, user, tmp_path, text)
+    first = write_chunks(db, document, ProgressTracker())
+    db.execute(
+        update(DocumentChunk)
+        .where(DocumentChunk.document_id == document.id)
+        .values(content_hash=None)
+    )
+    db.commit()
+
+    second = write_chunks(db, document, ProgressTracker(), batch_size=2)
+
+    assert second.reused_chunks == first.total_chunks
+    assert second.embedded_chunks == 0
+    hashes = db.execute(
+        select(DocumentChunk.content, DocumentChunk.content_hash).where(
+            DocumentChunk.document_id == document.id
+        )
+    ).all()
+    assert all(h == chunk_hash(content) for content, h in hashes)
+
+
+def test_release_stale_files_deletes_replaced_files(db, user, tmp_path):
+    document = _document(db, user, tmp_path, "본문")
+    stale = [_write(tmp_path / f"old{i}.txt", "이전") for i in range(2)]
+    document.stale_file_paths = json.dumps(stale)
+    db.commit()
+
+    release_stale_files(db, document.id)
+
+    db.refresh(document)
+    assert document.stale_file_paths is None
+    assert not any((tmp_path / f"old{i}.txt").exists() for i in range(2))
+    assert (tmp_path / "v1.txt").exists()
+
+
+def test_worker_metrics_include_document_process_values(tmp_path, monkeypatch):
+    """문서 처리 프로세스가 기록한 값이 워커 /metrics 레지스트리에 합산됨"""
+    from core.metrics import metrics_registry
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    child = (
+        "from core.metrics import INGEST_CHUNKS, stage_timer\n"
+        "INGEST_CHUNKS.labels('embedded').inc(3)\n"
+        "with stage_timer('embedding'):\n"
+        "    pass\n"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", child], check=True, cwd=backend)
+
+    registry = metrics_registry()
+    embedded = {"result": "embedded"}
+    assert registry.get_sample_value("rag_ingest_chunks_total", embedded) == 3
+    stage = {"stage": "embedding"}
+    assert registry.get_sample_value("rag_stage_duration_seconds_count", stage) == 1
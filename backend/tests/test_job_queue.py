@@ -0,0 +1,64 @@
+import fakeredis
+import pytest
+
+from services.job_queue import InMemoryJobQueue, RedisJobQueue
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _redis_queue(server) -> RedisJobQueue:
+    queue = RedisJobQueue("redis://localhost:6379/0")
+    queue._client = fakeredis.FakeRedis(server=server)
+    return queue
+
+
+def test_recover_requeues_jobs_left_processing_by_dead_worker(server):
+    crashed = _redis_queue(server)
+    assert crashed.enqueue(1)
+    assert crashed.enqueue(2)
+    assert crashed.dequeue(timeout=0.1).document_id == 1
+    assert crashed.depth() == 1
+
+    # 새 워커가 시작하면 실행 중이던 작업이 대기열로 돌아온다
+    restarted = _redis_queue(server)
+    assert restarted.recover() == 1
+    assert restarted.depth() == 2
+    # 중복 방지 집합은 유지돼 같은 문서를 다시 넣지 않는다
+    assert not restarted.enqueue(1)
+
+    # 되돌린 작업이 새 작업보다 먼저 실행된다
+    order = [restarted.dequeue(timeout=0.1).document_id for _ in range(2)]
+    assert order == [1, 2]
+    assert restarted.recover() == 2
+
+
+def test_redis_queue_ack_and_retry(server):
+    queue = _redis_queue(server)
+    assert queue.enqueue(5)
+    assert not queue.enqueue(5)
+
+    job = queue.dequeue(timeout=0.1)
+    queue.retry(job, delay=0.0)
+    retried = queue.dequeue(timeout=0.1)
+    assert (retried.document_id, retried.attempts) == (5, 1)
+
+    queue.ack(retried)
+    assert queue.depth() == 0
+    assert queue.recover() == 0
+    assert queue.enqueue(5)
+
+
+def test_in_memory_queue_dedupes_until_ack():
+    queue = InMemoryJobQueue()
+    assert queue.enqueue(1)
+    assert not queue.enqueue(1)
+
+    job = queue.dequeue(timeout=0.1)
+    assert not queue.enqueue(1)
+    queue.ack(job)
+    assert queue.enqueue(1)
+    assert queue.dequeue(timeout=0.0).document_id == 1
+    assert queue.dequeue(timeout=0.0) is None
@@ -0,0 +1,111 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from core.metrics import MetricsMiddleware, render_metrics, stage_timer
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, router=app.router)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+async def _get(app, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await client.get(path)
+
+
+def _latency_count(route: str, status: str) -> float:
+    return _sample(
+        "http_request_duration_seconds_count", method="GET", route=route, status=status
+    )
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template_not_raw_path():
+    app = _app()
+    before = _latency_count("/items/{item_id}", "200")
+
+    for item_id in (1, 2, 3):
+        assert (await _get(app, f"/items/{item_id}")).status_code == 200
+    assert (await _get(app, "/nowhere")).status_code == 404
+
+    assert _latency_count("/items/{item_id}", "200") - before == 3
+    assert _latency_count("/items/1", "200") == 0
+    assert _latency_count("unmatched", "404") >= 1
+    in_flight = _sample(
+        "http_requests_in_flight", method="GET", route="/items/{item_id}"
+    )
+    assert in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_observes_requests_that_raise():
+    app = _app()
+    before = _latency_count("/boom", "500")
+
+    response = await _get(app, "/boom")
+
+    assert response.status_code == 500
+    assert _latency_count("/boom", "500") - before == 1
+    assert _sample("http_requests_in_flight", method="GET", route="/boom") == 0
+
+
+@pytest.mark.asyncio
+async def test_stage_timer_records_stage_label_and_errors():
+    def count(stage):
+        return _sample("rag_stage_duration_seconds_count", stage=stage)
+
+    def errors(stage):
+        return _sample("rag_stage_errors_total", stage=stage)
+
+    with stage_timer("test_sync"):
+        pass
+
+    @stage_timer("test_async")
+    async def work(fail: bool):
+        if fail:
+            raise ValueError("fail")
+
+    await work(False)
+    with pytest.raises(ValueError):
+        await work(True)
+
+    assert count("test_sync") == 1
+    assert count("test_async") == 2
+    assert errors("test_sync") == 0
+    assert errors("test_async") == 1
+
+
+def test_render_metrics_uses_prometheus_text_format():
+    body, content_type = render_metrics()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert b"# TYPE http_request_duration_seconds histogram" in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_prometheus_content_type():
+    from app.main import app
+
+    response = await _get(app, "/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "rag_stage_duration_seconds" in response.text
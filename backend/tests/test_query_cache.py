@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from services.query_cache import DocumentSetVersions, QueryCache
+
+
+def _cache(tmp_path) -> QueryCache:
+    versions = DocumentSetVersions(None, str(tmp_path))
+    return QueryCache(versions, ttl=60, local_size=100, lock_timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_leader_is_cancelled(tmp_path):
+    cache = _cache(tmp_path)
+    started = asyncio.Event()
+    calls = []
+
+    async def compute(name):
+        calls.append(name)
+        started.set()
+        await asyncio.sleep(0.05)
+        return name
+
+    leader = asyncio.create_task(
+        cache.get_or_compute("search", 1, "q", lambda: compute("leader"))
+    )
+    await started.wait()
+    waiters = [
+        asyncio.create_task(
+            cache.get_or_compute("search", 1, "q", lambda i=i: compute(f"w{i}"))
+        )
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    results = await asyncio.gather(*waiters)
+
+    assert leader.cancelled()
+    assert calls == ["leader", "w0"]
+    assert results == ["w0", "w0", "w0"]
+    assert await cache.get_or_compute("search", 1, "q", lambda: compute("x")) == "w0"
+
+
+@pytest.mark.asyncio
+async def test_leader_error_reaches_waiters(tmp_path):
+    cache = _cache(tmp_path)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("search", 1, "q", fail) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.counters["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_file_versions_are_shared_between_instances(tmp_path):
+    api = DocumentSetVersions(None, str(tmp_path))
+    worker = DocumentSetVersions(None, str(tmp_path))
+
+    worker.bump(7)
+    await worker.bump_async(7)
+
+    assert await api.get(7) == 2
+    assert await api.get(8) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_bump_bypasses_cache_until_retry_succeeds(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    versions = cache.versions
+
+    def broken(user_id):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(versions._files, "incr", broken)
+    versions.bump(1)
+
+    async def compute():
+        return "fresh"
+
+    assert await cache.get_or_compute("search", 1, "q", compute) == "fresh"
+    assert cache.counters["bypassed"] == 1
+
+    monkeypatch.undo()
+    assert await cache.get_or_compute("search", 1, "q", compute) == "fresh"
+    assert cache.counters["bypassed"] == 1
+    assert await versions.get(1) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_session_commit_bumps_version():
+    from app.database import AsyncSessionLocal, engine
+    from models.base import Base
+    from models.document import Document
+    from models.user import User
+    from services.query_cache import document_set_versions
+
+    Base.metadata.create_all(engine)
+    async with AsyncSessionLocal() as db:
+        user = User(email="v@example.com", username="v", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        before = await document_set_versions.get(user.id)
+        db.add(
+            Document(
+                title="t",
+                filename="t.txt",
+                file_path="t.txt",
+                file_size=1,
+                file_type="txt",
+                user_id=user.id,
+            )
+        )
+        await db.commit()
+    assert await document_set_versions.get(user.id) == before + 1
+
+
+def _cache_event(cache: str, event: str) -> float:
+    from prometheus_client import REGISTRY
+
+    labels = {"cache": cache, "event": event}
+    return REGISTRY.get_sample_value("rag_cache_events_total", labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_counters_are_exported_to_prometheus(tmp_path):
+    from core.metrics import render_metrics
+
+    versions = DocumentSetVersions(None, str(tmp_path))
+    cache = QueryCache(versions, ttl=60, local_size=1, lock_timeout=1.0)
+    before = {
+        event: _cache_event("query", event) for event in ("hit", "miss", "eviction")
+    }
+
+    async def compute():
+        return "r"
+
+    await cache.get_or_compute("search", 1, "a", compute)
+    await cache.get_or_compute("search", 1, "a", compute)
+    await cache.get_or_compute("search", 1, "b", compute)
+
+    assert _cache_event("query", "hit") - before["hit"] == 1
+    assert _cache_event("query", "miss") - before["miss"] == 2
+    assert _cache_event("query", "eviction") - before["eviction"] == 1
+    body, _ = render_metrics()
+    assert b'rag_cache_events_total{cache="query",event="hit"}' in body
+    assert b'rag_cache_entries{cache="query"} 1.0' in body
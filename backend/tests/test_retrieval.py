@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+
+from services import index_files
+from services.lexical_index import LexicalIndex, tokenize
+from services.local_vector_index import LocalVectorStore
+from services.retrieval import reciprocal_rank_fusion
+from services.vector_store import SearchHit
+
+
+def _lexical(tmp_path, rows):
+    index = LexicalIndex.create(str(tmp_path / "lexical"))
+    chunk_ids, document_ids, user_ids, texts = zip(*rows)
+    index.add(chunk_ids, document_ids, user_ids, texts)
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_korean_bigrams():
+    tokens = tokenize("펌프 PX-4471 교체, 제3조")
+
+    assert "px-4471" in tokens
+    assert "제3조" in tokens
+    assert tokens[:1] == ["펌프"]
+
+
+def test_bm25_ranks_rare_and_repeated_terms_higher(tmp_path):
+    index = _lexical(
+        tmp_path,
+        [
+            (1, 10, 1, "펌프 점검 절차"),
+            (2, 10, 1, "펌프 펌프 펌프 임펠러 교체"),
+            (3, 11, 1, "계약서 제3조 해지 조건"),
+            (4, 11, 1, "점검 일정"),
+        ],
+    )
+
+    assert [hit.chunk_id for hit in index.search("펌프", k=5)] == [2, 1]
+    assert index.search("제3조", k=5)[0].chunk_id == 3
+
+
+def test_bm25_filters_before_top_k(tmp_path):
+    rows = [(i, 100 + i % 3, i % 2, f"공통 문서 {i}") for i in range(1, 31)]
+    index = _lexical(tmp_path, rows)
+
+    hits = index.search("공통", k=5, user_id=1, document_ids=[100])
+    assert len(hits) == 5
+    assert all(hit.document_id == 100 and hit.chunk_id % 2 == 1 for hit in hits)
+
+
+def test_bm25_survives_flush_reload_and_delete(tmp_path):
+    index = _lexical(tmp_path, [(1, 10, 1, "임펠러"), (2, 11, 1, "임펠러 교체")])
+    index.flush()
+    reader = LexicalIndex(str(tmp_path / "lexical"))
+    assert {hit.chunk_id for hit in reader.search("임펠러")} == {1, 2}
+
+    index.delete_documents([11])
+    index.flush()
+    assert reader.reload_if_stale()
+    assert [hit.chunk_id for hit in reader.search("임펠러")] == [1]
+
+
+def test_bm25_looks_up_terms_without_decoding_dictionary(tmp_path):
+    words = ["가나", "abc", "z9", "ω", "펌프", "a", "ab"]
+    rows = [(i, 10, 1, word) for i, word in enumerate(words, start=1)]
+    index = _lexical(tmp_path, rows)
+    index.compact()
+    reader = LexicalIndex(str(tmp_path / "lexical"))
+
+    for chunk_id, word in enumerate(words, start=1):
+        assert [hit.chunk_id for hit in reader.search(word)] == [chunk_id]
+    assert reader.search("b") == []
+    assert "terms" not in vars(reader._base)
+    assert reader.stats()["terms"] == len(words)
+
+
+def test_bm25_reader_keeps_previous_generation_during_compaction(tmp_path, monkeypatch):
+    index = _lexical(tmp_path, [(1, 10, 1, "임펠러"), (2, 11, 1, "임펠러 교체")])
+    index.compact()
+    reader = LexicalIndex(str(tmp_path / "lexical"))
+    old_dir = reader._generation_dir
+
+    index.delete_documents([11])
+    index.compact()
+    assert os.path.isdir(old_dir)
+    assert {hit.chunk_id for hit in reader.search("임펠러")} == {1, 2}
+
+    read_state = reader._read_state
+    calls = []
+
+    def racing(manifest):
+        calls.append(manifest["directory"])
+        state = read_state(manifest)
+        if len(calls) == 1:
+            index.add([3], [12], [1], ["임펠러 점검"])
+            index.compact()
+        return state
+
+    monkeypatch.setattr(reader, "_read_state", racing)
+    assert reader.reload_if_stale()
+    assert len(calls) == 2
+    assert {hit.chunk_id for hit in reader.search("임펠러")} == {1, 3}
+
+    monkeypatch.setattr(index_files, "GENERATION_GRACE", 0.0)
+    index.compact()
+    assert not os.path.exists(old_dir)
+
+
+def test_rrf_rewards_agreement_between_retrievers():
+    vector = [SearchHit(1, 10, 0.9), SearchHit(2, 10, 0.8), SearchHit(3, 11, 0.7)]
+    lexical = [SearchHit(3, 11, 12.0), SearchHit(4, 12, 9.0), SearchHit(2, 10, 1.0)]
+
+    fused = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, k=60)
+
+    assert [hit.chunk_id for hit in fused][:2] == [3, 2]
+    assert fused[0].ranks == {"vector": 3, "lexical": 1}
+    assert {hit.chunk_id for hit in fused} == {1, 2, 3, 4}
+
+
+def test_rrf_weights_shift_ranking():
+    vector = [SearchHit(1, 10, 0.9)]
+    lexical = [SearchHit(2, 10, 5.0)]
+
+    fused = reciprocal_rank_fusion(
+        {"vector": vector, "lexical": lexical}, weights={"lexical": 2.0}
+    )
+    assert [hit.chunk_id for hit in fused] == [2, 1]
+
+
+def test_vector_search_filters_documents_before_top_k(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(60, 8)).astype(np.float32)
+    store = LocalVectorStore.build(
+        str(tmp_path / "vectors"), range(60), np.arange(60) % 6, [1] * 60, vectors
+    )
+    store.add([100], [5], [1], vectors[:1])
+
+    hits = store.search(vectors[0], k=5, user_ids=1, document_ids=[3, 5])[0]
+    assert len(hits) == 5
+    assert {hit.document_id for hit in hits} <= {3, 5}
+    assert hits[0].chunk_id == 100
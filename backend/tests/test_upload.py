@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.config import settings
+from services.upload import FileTooLargeError, UploadError, receive_upload
+
+BOUNDARY = "test-boundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def _multipart(*parts) -> bytes:
+    """(name, filename, data) 파트로 multipart 본문 생성 (filename=None 이면 폼 필드)"""
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += (
+            f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode()
+            + data
+            + b"\r\n"
+        )
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def _chunks(body: bytes, size: int, consumed=None, fail_after=None):
+    for offset in range(0, len(body), size):
+        if fail_after is not None and offset >= fail_after:
+            raise ConnectionResetError("client disconnected")
+        if consumed is not None:
+            consumed.append(offset)
+        yield body[offset : offset + size]
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", None)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_streams_file_in_parts_and_keeps_form_fields(upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16)
+    data = "펌프 임펠러 교체 주기\n".encode() * 20
+    body = _multipart(("title", None, "매뉴얼".encode()), ("file", "m.txt", data))
+
+    stored, fields = await receive_upload(CONTENT_TYPE, _chunks(body, 7))
+
+    assert fields == {"title": "매뉴얼"}
+    assert stored.filename == "m.txt" and stored.extension == ".txt"
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    with open(stored.location, "rb") as f:
+        assert f.read() == data
+    assert os.listdir(upload_dir) == [os.path.basename(stored.location)]
+
+
+@pytest.mark.asyncio
+async def test_size_limit_stops_reading_and_removes_partial_file(upload_dir):
+    body = _multipart(("file", "big.txt", b"x" * 4096))
+    consumed = []
+
+    with pytest.raises(FileTooLargeError):
+        await receive_upload(CONTENT_TYPE, _chunks(body, 256, consumed), max_size=1000)
+
+    # 한도를 넘는 청크에서 바로 멈추고 나머지 본문은 읽지 않는다
+    assert len(consumed) < len(body) // 256
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        (
+            _multipart(("file", "a.txt", b"a" * 100), ("file", "b.txt", b"b")),
+            UploadError,
+        ),
+        (_multipart(("file", "a.txt", b"a" * 4096)), ConnectionResetError),
+    ],
+    ids=["second-file", "disconnect"],
+)
+@pytest.mark.asyncio
+async def test_errors_while_streaming_remove_partial_file(upload_dir, body, error):
+    with pytest.raises(error):
+        await receive_upload(CONTENT_TYPE, _chunks(body, 64, fail_after=1024))
+
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_rejects_requests_without_file_or_multipart(upload_dir):
+    with pytest.raises(UploadError):
+        await receive_upload("application/json", _chunks(b"{}", 8))
+    with pytest.raises(UploadError):
+        body = _multipart(("title", None, b"t"))
+        await receive_upload(CONTENT_TYPE, _chunks(body, 8))
+    with pytest.raises(UploadError):
+        body = _multipart(("file", "a.exe", b"MZ"))
+        await receive_upload(CONTENT_TYPE, _chunks(body, 8))
+    assert os.listdir(upload_dir) == []
+
+
+# ----------------------------------------------------------------------
+# 업로드 API
+# ----------------------------------------------------------------------
+@pytest_asyncio.fixture
+async def client(db, user, upload_dir):
+    from jose import jwt  # type: ignore
+
+    from app.main import app
+
+    token = jwt.encode(
+        {"sub": str(user.id)}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        yield client
+
+
+async def _upload(client, data: bytes, method="POST", url="/api/documents/upload"):
+    return await client.request(
+        method,
+        url,
+        content=_multipart(("file", "manual.txt", data)),
+        headers={"Content-Type": CONTENT_TYPE},
+    )
+
+
+@pytest.mark.parametrize(
+    "content_length, status",
+    [(None, 411), ("abc", 400), (str(10**12), 413)],
+)
+@pytest.mark.asyncio
+async def test_content_length_is_checked_before_reading_body(
+    client, upload_dir, content_length, status
+):
+    request = client.build_request(
+        "POST",
+        "/api/documents/upload",
+        content=_multipart(("file", "manual.txt", b"data")),
+        headers={"Content-Type": CONTENT_TYPE},
+    )
+    if content_length is None:
+        del request.headers["Content-Length"]
+    else:
+        request.headers["Content-Length"] = content_length
+
+    response = await client.send(request)
+
+    assert response.status_code == status
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_returns_413_while_streaming(
+    client, upload_dir, monkeypatch
+):
+    # Content-Length 사전 검사는 통과하고 스트리밍 중에 한도를 넘는다
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 100)
+    monkeypatch.setattr(settings, "UPLOAD_FIELD_MAX_SIZE", 10_000)
+
+    response = await _upload(client, b"x" * 1000)
+
+    assert response.status_code == 413
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_returns_existing_document(client, upload_dir):
+    first = await _upload(client, b"same manual")
+    second = await _upload(client, b"same manual")
+
+    assert first.status_code == second.status_code == 201
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["duplicate"] is True
+    assert len(os.listdir(upload_dir)) == 1
+
+
+@pytest.mark.asyncio
+async def test_replace_file_skips_identical_content_and_keeps_old_file(
+    client, db, upload_dir
+):
+    from models.document import Document  # type: ignore
+
+    created = (await _upload(client, b"v1")).json()
+    url = f"/api/documents/{created['id']}/file"
+    original = db.get(Document, created["id"]).file_path
+
+    same = await _upload(client, b"v1", method="PUT", url=url)
+    assert same.status_code == 200
+    db.expire_all()
+    assert db.get(Document, created["id"]).file_path == original
+    assert os.listdir(upload_dir) == [os.path.basename(original)]
+
+    replaced = await _upload(client, b"v2", method="PUT", url=url)
+    assert replaced.status_code == 200
+    db.expire_all()
+    document = db.get(Document, created["id"])
+    assert document.file_path != original
+    assert document.content_hash == hashlib.sha256(b"v2").hexdigest()
+    assert not document.is_processed
+    # 이전 파일은 처리 작업이 끝날 때까지 남겨 두고 워커가 지운다
+    assert json.loads(document.stale_file_paths) == [original]
+    assert os.path.exists(original)
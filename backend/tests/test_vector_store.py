@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+import pytest
+
+from services import index_files, local_vector_index
+from services.local_vector_index import LocalVectorStore
+
+DIM = 16
+
+
+def _vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(count, DIM)).astype(np.float32)
+
+
+def _empty_store(path) -> LocalVectorStore:
+    empty = np.empty(0, dtype=np.int64)
+    return LocalVectorStore.build(
+        str(path), empty, empty, empty, np.empty((0, DIM), np.float32)
+    )
+
+
+def _ids(hits):
+    return [hit.chunk_id for hit in hits]
+
+
+def test_add_flush_reload(tmp_path):
+    store = _empty_store(tmp_path)
+    vectors = _vectors(10)
+    store.add(range(10), [1] * 5 + [2] * 5, [7] * 10, vectors)
+    store.flush()
+
+    reader = LocalVectorStore(str(tmp_path))
+    assert reader.search(vectors[3], k=1)[0][0].chunk_id == 3
+    assert sorted(reader.document_chunk_ids(2).tolist()) == [5, 6, 7, 8, 9]
+
+    store.add([10], [3], [7], vectors[:1] * -1)
+    store.flush()
+    assert reader.reload_if_stale()
+    assert 10 in reader.document_chunk_ids(3).tolist()
+    assert not reader.reload_if_stale()
+
+
+def test_search_filters_by_user_before_top_k(tmp_path):
+    vectors = _vectors(40)
+    store = LocalVectorStore.build(
+        str(tmp_path), range(40), np.arange(40) // 10, np.arange(40) % 2, vectors
+    )
+    hits = store.search(vectors[:2], k=5, user_ids=[1, None])
+
+    assert len(hits[0]) == 5
+    assert all(hit.chunk_id % 2 == 1 for hit in hits[0])
+    assert hits[1][0].chunk_id == 1
+
+
+def test_delete_then_compact(tmp_path):
+    vectors = _vectors(30)
+    store = LocalVectorStore.build(
+        str(tmp_path), range(30), np.arange(30) // 10, [1] * 30, vectors, nprobe=64
+    )
+    store.add([100], [5], [1], vectors[:1])
+    store.delete_documents([0])
+    store.delete_chunks([15])
+
+    def found():
+        hits = store.search(vectors, k=1)
+        return {chunk_id for row in hits for chunk_id in _ids(row)}
+
+    before = found()
+    assert not before & set(range(10)) and 15 not in before
+
+    store.compact()
+    assert len(store._chunk_ids) == 20
+    assert len(store._delta_chunk_ids) == 0
+    assert found() == before
+    assert sorted(store.document_chunk_ids(5).tolist()) == [100]
+
+
+def test_flush_compacts_large_delta(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_vector_index, "_COMPACT_DELTA_MIN", 8)
+    store = _empty_store(tmp_path)
+    vectors = _vectors(8)
+    store.add(range(8), [1] * 8, [1] * 8, vectors)
+    store.flush()
+
+    assert len(store._chunk_ids) == 8
+    assert len(store._delta_chunk_ids) == 0
+    reader = LocalVectorStore(str(tmp_path))
+    assert reader.search(vectors[4], k=1)[0][0].chunk_id == 4
+
+
+def test_add_rejects_dimension_mismatch(tmp_path):
+    store = _empty_store(tmp_path)
+    with pytest.raises(ValueError):
+        store.add([1], [1], [1], np.ones((1, DIM + 1), np.float32))
+
+
+def _tenant_corpus(tenant_size: int, count: int = 5000):
+    """다른 사용자 벡터 사이에 쿼리 반대편에 몰린 소규모 사용자 벡터를 섞음"""
+    rng = np.random.default_rng(3)
+    vectors = _vectors(count, seed=2)
+    query = vectors[0]
+    tenant = -query + 0.3 * rng.normal(size=(tenant_size, DIM))
+    rows = rng.choice(np.arange(1, count), tenant_size, replace=False)
+    vectors[rows] = tenant
+    users = np.ones(count, dtype=np.int64)
+    users[rows] = 99
+    return vectors, users, rows, query
+
+
+def test_small_tenant_outside_default_probes_gets_full_results(tmp_path):
+    vectors, users, rows, query = _tenant_corpus(tenant_size=30)
+    store = LocalVectorStore.build(
+        str(tmp_path),
+        range(5000),
+        np.arange(5000) // 50,
+        users,
+        vectors,
+        nlist=100,
+        nprobe=2,
+    )
+    # 쿼리 근처 리스트에는 이 사용자의 벡터가 없다
+    probes = np.argsort(-(store._centroids @ query / np.linalg.norm(query)))[:2]
+    tenant_rows = np.flatnonzero(np.asarray(store._user_ids) == 99)
+    tenant_lists = np.searchsorted(store._offsets, tenant_rows, side="right") - 1
+    assert not set(probes) & set(tenant_lists)
+
+    hits = store.search(query, k=10, user_ids=99)[0]
+    assert len(hits) == 10
+    assert {hit.chunk_id for hit in hits} <= set(rows.tolist())
+    scores = [hit.score for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+
+    document = int(np.arange(5000)[rows[0]] // 50)
+    hits = store.search(query, k=10, document_ids=[document])[0]
+    assert hits and all(hit.document_id == document for hit in hits)
+
+
+def test_large_tenant_probes_only_lists_with_its_vectors(tmp_path):
+    vectors, users, rows, query = _tenant_corpus(tenant_size=400)
+    store = LocalVectorStore.build(
+        str(tmp_path),
+        range(5000),
+        np.zeros(5000),
+        users,
+        vectors,
+        nlist=100,
+        nprobe=2,
+    )
+
+    hits = store.search(np.vstack([query, -query]), k=10, user_ids=[99, 99])
+    assert [len(row) for row in hits] == [10, 10]
+    assert all(hit.chunk_id in set(rows.tolist()) for row in hits for hit in row)
+
+
+def test_reader_survives_compaction_and_generation_is_kept_for_grace(
+    tmp_path, monkeypatch
+):
+    vectors = _vectors(20)
+    writer = LocalVectorStore.build(
+        str(tmp_path), range(20), [1] * 20, [1] * 20, vectors
+    )
+    reader = LocalVectorStore(str(tmp_path))
+    old_dir = reader._generation_dir
+
+    writer.delete_chunks([0])
+    writer.compact()
+    # 이전 세대는 유예 시간 동안 남아 있어 로드 중인 리더가 파일을 잃지 않는다
+    assert os.path.isdir(old_dir)
+    assert reader.search(vectors[5], k=1)[0][0].chunk_id == 5
+    assert reader.reload_if_stale()
+    assert 0 not in reader.document_chunk_ids(1).tolist()
+
+    monkeypatch.setattr(index_files, "GENERATION_GRACE", 0.0)
+    writer.compact()
+    assert not os.path.exists(old_dir)
+
+
+def test_load_retries_when_manifest_changes_midway(tmp_path):
+    vectors = _vectors(20)
+    writer = LocalVectorStore.build(
+        str(tmp_path), range(20), [1] * 20, [1] * 20, vectors
+    )
+    reader = LocalVectorStore(str(tmp_path))
+    writer.add([100], [2], [1], vectors[:1])
+    writer.compact()
+
+    read_state = reader._read_state
+    calls = []
+
+    def racing(manifest):
+        calls.append(manifest["directory"])
+        state = read_state(manifest)
+        if len(calls) == 1:
+            writer.delete_documents([2])
+            writer.compact()
+        return state
+
+    reader._read_state = racing
+    assert reader.reload_if_stale()
+
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert reader._generation_dir == writer._generation_dir
+    assert reader.document_chunk_ids(2).size == 0
+    assert not reader.reload_if_stale()
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from core.vectors import VectorDType, decode_matrix, encode_matrix, numpy_dtype
+
+
+def _matrix(rows: int = 4, dim: int = 16) -> np.ndarray:
+    matrix = np.random.default_rng(0).standard_normal((rows, dim))
+    matrix[1] = 0.0  # 스케일이 0 이 되는 행
+    return matrix.astype(np.float32)
+
+
+@pytest.mark.parametrize(
+    "dtype, tolerance",
+    [(VectorDType.FLOAT32, 0.0), (VectorDType.FLOAT16, 1e-3), (VectorDType.INT8, 0.02)],
+)
+def test_pack_unpack_round_trip(dtype, tolerance):
+    matrix = _matrix()
+    blobs, scales = encode_matrix(matrix, dtype)
+
+    assert all(len(blob) == 16 * numpy_dtype(dtype).itemsize for blob in blobs)
+    restored = decode_matrix(blobs, 16, dtype, scales)
+    assert restored.dtype == np.float32
+    assert restored.shape == matrix.shape
+    # float16·int8 오차는 행의 최댓값에 비례한다
+    bound = tolerance * np.abs(matrix).max(axis=1, keepdims=True) + 1e-6
+    assert np.all(np.abs(restored - matrix) <= bound)
+    assert not restored[1].any()
+
+
+def test_float32_decode_is_zero_copy_view():
+    blobs, scales = encode_matrix(_matrix(rows=2), VectorDType.FLOAT32)
+
+    restored = decode_matrix(blobs, 16, VectorDType.FLOAT32, scales)
+    assert not restored.flags.owndata
+
+
+def test_decode_rejects_wrong_length():
+    blobs, scales = encode_matrix(_matrix(rows=2), VectorDType.FLOAT16)
+
+    with pytest.raises(ValueError):
+        decode_matrix(blobs, 15, VectorDType.FLOAT16, scales)